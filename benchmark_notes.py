@@ -0,0 +1,276 @@
+"""
+Script python mesurant les performances des fonctions de gestion_notes.py sur des promos générées aléatoirement
+
+Usage : ./benchmark_notes.py [--rapport <fichier>] [--sans-memoire] [<taille1> <taille2> ...]
+        <taille1> <taille2> ... sont les nombres d'étudiants des promos générées (par défaut 1000 10000 100000).
+        --rapport <fichier> écrit le rapport JSON dans ce fichier plutôt que sur la sortie standard.
+        --sans-memoire ne mesure pas la mémoire maximale (chaque fonction n'est alors exécutée qu'une fois).
+
+Pour chaque taille, une promo et deux fichiers de notes sont générés dans un dossier temporaire, puis
+chaque fonction est chronométrée et sa mémoire maximale mesurée avec tracemalloc, lors d'une seconde exécution.
+Les fonctions en O(n²) ne sont mesurées que jusqu'à la taille donnée dans TAILLES_MAX.
+
+CU : le fichier gestion_notes.py doit se trouver dans le même dossier
+"""
+
+import datetime
+import json
+import os.path
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import gestion_notes
+
+NOMS = ["CALBUTH", "BEAU", "NAGET", "SOETE", "PERON", "SBAI", "GUILLON ", "HOUTEKIET"]
+PRENOMS = ["RAYMOND", "MONIQUE", "ARTHUR", "CEDRIC", "THOMAS", "DAVID", "SIMON", "WISSEM"]
+TAILLES_MAX = {"trie_bulles_etudiants": 5000, # Au delà, ces fonctions prennent plusieurs minutes
+               "reporter_notes1": 10000}
+PROPORTION_NOTES = 0.9 # Proportion des étudiants qui ont une note dans chaque UE
+NB_UES_NOYAU = 40 # Nombre d'UE de la matrice de notes de noyau_resultats
+
+def generer_etudiants(nombre, graine=0):
+    """
+    Renvoie une liste de nombre fiches d'étudiants aléatoires, de NIP tous différents.
+
+    :param nombre: (int) le nombre d'étudiants
+    :param graine: (int) la graine du générateur aléatoire
+    :return: (list) une liste de fiches (NIP, NOM, PRENOM, PROFIL, GROUPE, NOTES)
+
+    CU: 0 <= nombre <= 90000000
+
+    Exemple:
+
+    >>> etudiants = generer_etudiants(50)
+    >>> len(etudiants), len(set(etudiant[0] for etudiant in etudiants))
+    (50, 50)
+    """
+    alea = random.Random(graine)
+    profils = list(gestion_notes.PROFILS.values())
+    nips = alea.sample(range(10000000, 100000000), nombre)
+    return [(str(nip),
+             alea.choice(NOMS),
+             alea.choice(PRENOMS),
+             alea.choice(profils),
+             str(alea.randint(1, 60)),
+             {UE: None for UE in gestion_notes.UES})
+            for nip in nips]
+
+def generer_notes(etudiants, proportion=PROPORTION_NOTES, graine=0):
+    """
+    Renvoie une liste de notes aléatoires (couples NIP, note) pour une partie des étudiants, dans un ordre aléatoire.
+
+    :param etudiants: (list) les fiches des étudiants
+    :param proportion: (float) la proportion des étudiants qui ont une note
+    :param graine: (int) la graine du générateur aléatoire
+    :return: ([(str, float)])
+
+    CU: 0 <= proportion <= 1
+
+    Exemple:
+
+    >>> notes = generer_notes(generer_etudiants(50), 0.5)
+    >>> len(notes), all(0 <= note <= 20 for NIP, note in notes)
+    (25, True)
+    """
+    alea = random.Random(graine)
+    choisis = alea.sample(etudiants, int(len(etudiants) * proportion))
+    return [(etudiant[0], round(alea.uniform(0, 20), 1)) for etudiant in choisis]
+
+def ecrire_liste_etudiants(fichier, etudiants):
+    """
+    Ecrit des fiches d'étudiants dans un fichier au format lu par lire_liste_etudiants.
+
+    :param fichier: (str) le fichier à écrire
+    :param etudiants: (list) les fiches des étudiants
+    :return: None
+
+    CU: any
+    """
+    codes_profils = {profil: code for code, profil in gestion_notes.PROFILS.items()}
+    with open(fichier, "w") as canal:
+        for etudiant in etudiants:
+            canal.write(gestion_notes.SEPARATEUR.join([etudiant[0], etudiant[1] + "- " + etudiant[2],
+                                                       codes_profils[etudiant[3]], etudiant[4]]) + "\n")
+
+def ecrire_liste_notes(fichier, notes):
+    """
+    Ecrit des notes dans un fichier au format lu par lire_liste_notes.
+
+    :param fichier: (str) le fichier à écrire
+    :param notes: ([(str, float)]) les couples (NIP, note)
+    :return: None
+
+    CU: any
+    """
+    with open(fichier, "w") as canal:
+        for NIP, note in notes:
+            canal.write(NIP + gestion_notes.SEPARATEUR + str(note) + "\n")
+
+def generer_colonnes(nombre, nb_ues, proportion=PROPORTION_NOTES, graine=0):
+    """
+    Renvoie une matrice de notes aléatoires, par colonnes, comme celles d'une Promo, et des coefficients aléatoires pour ses UE.
+
+    :param nombre: (int) le nombre d'étudiants
+    :param nb_ues: (int) le nombre d'UE
+    :param proportion: (float) la proportion des étudiants qui ont une note dans chaque UE
+    :param graine: (int) la graine du générateur aléatoire
+    :return: (([array], [int])) les colonnes array('d') des notes (NaN si absente) et les coefficients
+
+    CU: 0 <= proportion <= 1
+
+    Exemple:
+
+    >>> colonnes, coefficients = generer_colonnes(50, 3)
+    >>> len(colonnes), len(colonnes[0]), len(coefficients)
+    (3, 50, 3)
+    """
+    alea = random.Random(graine)
+    colonnes = [gestion_notes.array("d", [round(alea.uniform(0, 20), 1) if alea.random() < proportion else gestion_notes.NAN
+                                          for i in range(nombre)])
+                for UE in range(nb_ues)]
+    return colonnes, [alea.choice([1, 2, 3, 6]) for UE in range(nb_ues)]
+
+def mesurer(fonction, preparer, avec_memoire=True):
+    """
+    Renvoie la durée d'un appel à fonction et la mémoire maximale allouée pendant un second appel.
+    Les paramètres de chaque appel sont construits par preparer, hors des mesures.
+
+    :param fonction: (function) la fonction à mesurer
+    :param preparer: (function) une fonction sans paramètre qui renvoie le tuple des paramètres de fonction
+    :param avec_memoire: (bool) False pour ne pas faire le second appel
+    :return: ((float, int)) la durée en secondes et la mémoire maximale en octets (None si non mesurée)
+
+    CU: any
+
+    Exemple:
+
+    >>> duree, memoire = mesurer(sorted, lambda: (list(range(1000)),))
+    >>> duree > 0, memoire > 0
+    (True, True)
+    """
+    parametres = preparer()
+    debut = time.perf_counter()
+    fonction(*parametres)
+    duree = time.perf_counter() - debut
+    if not avec_memoire:
+        return duree, None
+    parametres = preparer()
+    tracemalloc.start()
+    try:
+        fonction(*parametres)
+        memoire = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return duree, memoire
+
+def cas_de_mesure(etudiants, dossier):
+    """
+    Renvoie les fonctions à mesurer sur une promo, chacune avec sa préparation.
+    Les fichiers d'entrée de la promo sont écrits dans dossier.
+
+    :param etudiants: (list) les fiches des étudiants
+    :param dossier: (str) un dossier où écrire les fichiers
+    :return: ([(str, function, function)]) les triplets (nom, fonction, preparer)
+
+    CU: any
+    """
+    fichier_etudiants = os.path.join(dossier, "liste_etudiants.csv")
+    fichier_notes = os.path.join(dossier, "notes_maths.csv")
+    fichier_sortie = os.path.join(dossier, "notes_etudiants.csv")
+    notes = generer_notes(etudiants)
+    notes_info = generer_notes(etudiants, graine=1)
+    ecrire_liste_etudiants(fichier_etudiants, etudiants)
+    ecrire_liste_notes(fichier_notes, notes)
+    etudiants_par_nip = sorted(etudiants)
+    notes_par_nip = sorted(notes)
+
+    def copie():
+        return [gestion_notes.copie_etudiant(etudiant) for etudiant in etudiants]
+
+    def promo_notee():
+        promo = gestion_notes.Promo(etudiants)
+        gestion_notes.joindre_notes(promo, {"maths": notes, "info": notes_info})
+        return promo
+
+    matrice = [] # Matrice de NB_UES_NOYAU UE, générée à la première mesure de noyau_resultats seulement
+
+    def matrice_notes():
+        if len(matrice) == 0:
+            matrice.extend(generer_colonnes(len(etudiants), NB_UES_NOYAU))
+        colonnes, coefficients = matrice
+        return colonnes, len(etudiants), coefficients
+
+    UE = gestion_notes.UES[0]
+    return [
+        ("lire_liste_etudiants", gestion_notes.lire_liste_etudiants, lambda: (fichier_etudiants,)),
+        ("lire_promo", gestion_notes.lire_promo, lambda: (fichier_etudiants,)),
+        ("lire_liste_notes", gestion_notes.lire_liste_notes, lambda: (fichier_notes,)),
+        ("lire_notes_mmap", gestion_notes.lire_notes_mmap, lambda: (fichier_notes,)),
+        ("trie_liste_etudiants", gestion_notes.trie_liste_etudiants, lambda: (list(etudiants),)),
+        ("trie_bulles_etudiants", gestion_notes.trie_bulles_etudiants, lambda: (list(etudiants),)),
+        ("reporter_notes1", gestion_notes.reporter_notes1, lambda: (UE, copie(), notes)),
+        ("reporter_notes2", gestion_notes.reporter_notes2, lambda: (UE, list(etudiants_par_nip), notes)),
+        ("reporter_notes3", gestion_notes.reporter_notes3, lambda: (UE, list(etudiants_par_nip), notes_par_nip)),
+        ("reporter_notes4", gestion_notes.reporter_notes4, lambda: (UE, copie(), notes)),
+        ("joindre_notes", gestion_notes.joindre_notes, lambda: (copie(), {"maths": notes, "info": notes_info})),
+        ("resultats", gestion_notes.resultats, lambda: (promo_notee(),)),
+        ("ecrire_notes", gestion_notes.ecrire_notes, lambda: (promo_notee(), fichier_sortie)),
+        ("ecrire_notes_binaire", gestion_notes.ecrire_notes, lambda: (promo_notee(), fichier_sortie, "binaire")),
+        ("noyau_resultats_40_ues", gestion_notes.noyau_resultats, matrice_notes),
+    ]
+
+def benchmark(tailles, avec_memoire=True):
+    """
+    Mesure toutes les fonctions de cas_de_mesure sur des promos des tailles données.
+
+    :param tailles: ([int]) les nombres d'étudiants des promos
+    :param avec_memoire: (bool) False pour ne pas mesurer la mémoire
+    :return: (dict) le rapport : l'environnement de la mesure et la liste des mesures
+             {"fonction", "taille", "duree", "etudiants_par_seconde", "memoire_max"}
+
+    CU: any
+    """
+    rapport = {"date": datetime.datetime.now().isoformat(timespec="seconds"),
+               "python": platform.python_version(),
+               "numpy": gestion_notes.importer_numpy() != None,
+               "mesures": []}
+    for taille in tailles:
+        etudiants = generer_etudiants(taille)
+        with tempfile.TemporaryDirectory() as dossier:
+            for nom, fonction, preparer in cas_de_mesure(etudiants, dossier):
+                if taille > TAILLES_MAX.get(nom, taille):
+                    continue
+                duree, memoire = mesurer(fonction, preparer, avec_memoire)
+                rapport["mesures"].append({"fonction": nom,
+                                           "taille": taille,
+                                           "duree": duree,
+                                           "etudiants_par_seconde": taille / duree if duree > 0 else None,
+                                           "memoire_max": memoire})
+                print("{0:>24} {1:>10} {2:>10.4f} s".format(nom, taille, duree), file=sys.stderr)
+    return rapport
+
+if __name__ == "__main__":
+    fichier_rapport = None
+    avec_memoire = True
+    tailles = []
+    arguments = iter(sys.argv[1:])
+    for argument in arguments:
+        if argument == "--rapport":
+            fichier_rapport = next(arguments, None)
+        elif argument == "--sans-memoire":
+            avec_memoire = False
+        else:
+            tailles.append(int(argument))
+    if len(tailles) == 0:
+        tailles = [1000, 10000, 100000]
+
+    rapport = benchmark(tailles, avec_memoire)
+    if fichier_rapport == None:
+        print(json.dumps(rapport, indent=2))
+    else:
+        with open(fichier_rapport, "w") as canal_rapport:
+            json.dump(rapport, canal_rapport, indent=2)
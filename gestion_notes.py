@@ -1,12 +1,24 @@
 """
 Script python permettant de gérer les notes d'une promo étdudiante
 
-Usage : ./gestion_notes.py <ue1> <ue2> ...
+Usage : ./gestion_notes.py [options] <ue1> <ue2> ...
         <ue1> <ue2> ... sont les noms des UE dont il faut reporter les notes.
+        --jobs <n> lit les fichiers de notes avec n processus en parallèle (1 par défaut).
+        --donnees <dossier> est le dossier des fichiers à lire (data par défaut).
+        --sortie <fichier> est le fichier de notes à écrire (notes_etudiants.csv par défaut).
+        --format csv|binaire est le format de ce fichier (csv par défaut).
+        --cache <fichier> est le fichier de sauvegarde entre deux exécutions (notes_etudiants.cache par défaut).
+        --test lance les doctests du module.
+        --profile écrit la durée, les lignes, les octets et la mémoire de chaque étape dans une trace JSON.
+        --trace <fichier> est le fichier de cette trace (profil_notes.json par défaut) et active --profile.
+        --cprofile <fichier> écrit aussi les statistiques de cProfile dans ce fichier.
+        Les variables d'environnement GESTION_NOTES_PROFIL et GESTION_NOTES_CPROFILE jouent le rôle de --trace et --cprofile.
         
-CU : il faut un fichier de nom notes_<ue>.csv par ue présent dans le dossier data
+CU : il faut un fichier de nom notes_<ue>.csv par ue présent dans le dossier des données
      et un fichier d'étudiants de nom liste_etudiants.csv
 
+Le module peut aussi être importé : executer fait le travail du script sans lire la ligne de commande.
+
 :Date: 2018-02-28
 :Dernière Révision: 2018-02-28
 :Auteurs:
@@ -14,17 +26,310 @@ CU : il faut un fichier de nom notes_<ue>.csv par ue présent dans le dossier da
     - Logan Becquembois
 """
 
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping, MutableSequence, Sequence, Sized
 from functools import cmp_to_key
+from operator import itemgetter
+import bisect
+import hashlib
+import heapq
+import itertools
+import math
+import mmap
+import struct
 import sys
+import time
 import os.path
 
+numpy = None # Importé à la première utilisation par importer_numpy
+numpy_cherche = False
+
 UES = ["maths", "info"] # Uncomment si on n'utilise pas le script
+COEFFICIENTS = {"maths": 1, "info": 1} # Coefficients (ECTS) des UE dans la moyenne, 1 pour une UE qui n'est pas dans ce dictionnaire
 PROFILS = {'1' : 'SESI',
            '2' : 'PEIP',
            '3' : 'MASS',
            '4' : 'LICAM'}
+LISTE_PROFILS = list(PROFILS.values())
 SEPARATEUR = '|'
 MENTIONS = ["Absent", "Ajourné", "Passable", "AB", "B", "TB"]
+SEUILS_MENTIONS = [10, 12, 14, 16] # Moyenne minimale de chaque mention à partir de "Passable"
+NOTE_MAX = 20
+CLES_STATISTIQUES = [None, "profil", "groupe"] # Classements de Statistiques : promo, profil ou groupe de l'étudiant
+TAILLE_TAMPON = 1 << 20 # Nombre de caractères lus d'un coup dans les fichiers csv
+NAN = float("nan") # Note absente dans les colonnes d'une Promo
+FICHIER_CACHE = "notes_etudiants.cache"
+VERSION_CACHE = 1 # À changer si le format de la sauvegarde de charger_promo_incrementale change
+TAILLE_LOT = 10000 # Nombre d'étudiants écrits d'un coup par ecrire_notes
+TAILLE_CACHE_RESULTATS = 1 << 17 # Nombre de résultats gardés par défaut par CacheResultats
+FORMATS_SORTIE = ["csv", "binaire"]
+MAGIE_BINAIRE = b"GNOTES\x00\x01" # Début des fichiers écrits par ecrire_notes_binaire (format version 1)
+TRACE = None # Trace du profilage en cours, voir activer_profilage
+FICHIER_PROFIL = "profil_notes.json" # Trace écrite par défaut avec --profile
+VARIABLE_PROFIL = "GESTION_NOTES_PROFIL" # Variable d'environnement qui active le profilage : fichier de la trace JSON
+VARIABLE_CPROFILE = "GESTION_NOTES_CPROFILE" # Variable d'environnement : fichier des statistiques de cProfile
+
+class Etape:
+    """
+    Mesure d'une étape du traitement, enregistrée dans la trace active (voir activer_profilage).
+    S'utilise avec with : la durée est mesurée entre l'entrée et la sortie du bloc, les lignes et octets
+    traités sont ajoutés par compter.
+    
+    La mémoire maximale de l'étape est le pic des allocations Python pendant le bloc, mesuré par tracemalloc :
+    le pic est remis à zéro à l'entrée, et le pic d'une étape englobante tient compte de celui des étapes qu'elle contient.
+    La mémoire maximale du processus depuis son lancement (ru_maxrss) est aussi relevée à la sortie, sous memoire_processus.
+    """
+    active = True
+
+    def __init__(self, nom):
+        self.mesure = {"nom": nom, "debut": None, "duree": None, "lignes": 0, "lignes_par_seconde": None,
+                       "octets_lus": 0, "octets_ecrits": 0, "memoire_max": None, "memoire_processus": None}
+        self.pic = 0 # Pic des allocations pendant les étapes contenues dans celle-ci
+
+    def compter(self, lignes=0, octets_lus=0, octets_ecrits=0):
+        """
+        Ajoute des lignes et des octets lus ou écrits à l'étape.
+        """
+        self.mesure["lignes"] += lignes
+        self.mesure["octets_lus"] += octets_lus
+        self.mesure["octets_ecrits"] += octets_ecrits
+
+    def __enter__(self):
+        import tracemalloc # Déjà importé par activer_profilage
+        self.debut = time.perf_counter()
+        self.mesure["debut"] = self.debut - TRACE["debut"]
+        TRACE["etapes"].append(self.mesure)
+        if TRACE["pile"]: # Le pic de l'étape englobante jusqu'ici serait perdu par reset_peak
+            englobante = TRACE["pile"][-1]
+            englobante.pic = max(englobante.pic, tracemalloc.get_traced_memory()[1])
+        TRACE["pile"].append(self)
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exception):
+        import tracemalloc
+        duree = time.perf_counter() - self.debut
+        pic = max(self.pic, tracemalloc.get_traced_memory()[1])
+        TRACE["pile"].pop()
+        if TRACE["pile"]:
+            englobante = TRACE["pile"][-1]
+            englobante.pic = max(englobante.pic, pic)
+        self.mesure["duree"] = duree
+        if duree > 0 and self.mesure["lignes"]:
+            self.mesure["lignes_par_seconde"] = self.mesure["lignes"] / duree
+        self.mesure["memoire_max"] = pic
+        self.mesure["memoire_processus"] = memoire_max_processus()
+        return False
+
+class EtapeInactive:
+    """
+    Etape qui ne mesure rien, renvoyée par etape quand le profilage est désactivé.
+    """
+    active = False
+
+    def compter(self, lignes=0, octets_lus=0, octets_ecrits=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+ETAPE_INACTIVE = EtapeInactive()
+
+def etape(nom):
+    """
+    Renvoie la mesure d'une étape du traitement, à utiliser avec with.
+    Sans profilage actif, renvoie toujours la même EtapeInactive : le coût se limite à cet appel.
+    
+    :param nom: (str) le nom de l'étape dans la trace
+    :return: (Etape ou EtapeInactive)
+    
+    CU: any
+    
+    Exemple:
+    
+    >>> with etape("lecture") as mesure:
+    ...     mesure.compter(lignes=10)
+    >>> mesure.active
+    False
+    """
+    if TRACE == None:
+        return ETAPE_INACTIVE
+    return Etape(nom)
+
+def memoire_max_processus():
+    """
+    Renvoie la mémoire maximale utilisée jusqu'ici par le processus, en octets, ou None si le système ne la donne pas.
+    
+    :return: (int)
+    
+    CU: any
+    """
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    memoire = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        memoire *= 1024 # Linux donne des kilo-octets, macOS des octets
+    return memoire
+
+def taille_fichier(fichier):
+    """
+    Renvoie la taille d'un fichier en octets, 0 s'il n'existe pas.
+    
+    :param fichier: (str) le nom du fichier
+    :return: (int)
+    
+    CU: any
+    """
+    try:
+        return os.path.getsize(fichier)
+    except OSError:
+        return 0
+
+def activer_profilage(fichier_trace, fichier_cprofile=None):
+    """
+    Active l'enregistrement des étapes du traitement, et le profilage par cProfile si fichier_cprofile est donné.
+    La trace est écrite au format JSON dans fichier_trace par terminer_profilage.
+    tracemalloc est démarré pour mesurer la mémoire de chaque étape : les allocations sont plus lentes pendant le profilage.
+    
+    :param fichier_trace: (str) le fichier de la trace JSON
+    :param fichier_cprofile: (str) le fichier des statistiques de cProfile (lisible avec pstats), None pour ne pas l'utiliser
+    :return: None
+    
+    CU: le profilage n'est pas déjà actif
+    
+    Exemple:
+    
+    >>> import json, tempfile
+    >>> fichier_trace = os.path.join(tempfile.mkdtemp(), "trace.json")
+    >>> activer_profilage(fichier_trace)
+    >>> with etape("lecture") as mesure:
+    ...     mesure.compter(lignes=len(lire_liste_notes("data/petite_notes_info.csv")), octets_lus=taille_fichier("data/petite_notes_info.csv"))
+    >>> terminer_profilage()
+    >>> with open(fichier_trace) as canal_trace:
+    ...     trace = json.load(canal_trace)
+    >>> [(mesure["nom"], mesure["lignes"], mesure["octets_lus"]) for mesure in trace["etapes"]]
+    [('lecture', 14, 192)]
+    >>> 0 < trace["etapes"][0]["memoire_max"] < 10**6
+    True
+    """
+    global TRACE
+    import tracemalloc # Import coûteux, inutile sans profilage
+    TRACE = {"fichier": fichier_trace, "debut": time.perf_counter(), "etapes": [], "pile": [], "cprofile": None,
+             "tracemalloc": not tracemalloc.is_tracing()}
+    if TRACE["tracemalloc"]:
+        tracemalloc.start()
+    if fichier_cprofile != None:
+        import cProfile
+        TRACE["cprofile"] = (cProfile.Profile(), fichier_cprofile)
+        TRACE["cprofile"][0].enable()
+
+def terminer_profilage():
+    """
+    Désactive le profilage et écrit la trace JSON, et les statistiques de cProfile s'il était utilisé.
+    
+    La trace contient la durée totale, la mémoire maximale du processus et, pour chaque étape dans l'ordre où elle a commencé,
+    son nom, son début (en secondes depuis activer_profilage), sa durée, ses lignes traitées (et lignes par seconde),
+    ses octets lus et écrits, le pic des allocations Python pendant l'étape (memoire_max)
+    et la mémoire maximale du processus depuis son lancement, relevée à la fin de l'étape (memoire_processus).
+    
+    :return: None
+    
+    CU: le profilage est actif
+    """
+    global TRACE
+    trace, TRACE = TRACE, None
+    if trace["cprofile"] != None:
+        profileur, fichier_cprofile = trace["cprofile"]
+        profileur.disable()
+        profileur.dump_stats(fichier_cprofile)
+    if trace["tracemalloc"]:
+        import tracemalloc
+        tracemalloc.stop()
+    import json
+    with open(trace["fichier"], "w") as canal_trace:
+        json.dump({"duree_totale": time.perf_counter() - trace["debut"],
+                   "memoire_processus": memoire_max_processus(),
+                   "etapes": trace["etapes"]}, canal_trace, indent=2)
+
+def parcourir_lignes(fichier):
+    """
+    Générateur des lignes d'un fichier, découpées selon SEPARATEUR.
+    Le fichier est lu par blocs d'environ TAILLE_TAMPON caractères : seul un bloc est en mémoire à la fois.
+    
+    :param fichier: (str) le nom ou chemin du fichier
+    :return: (generator) les listes de champs de chaque ligne
+    
+    CU: le fichier doit exister, sinon FileNotFoundError est levée
+    
+    Exemple:
+    
+    >>> next(parcourir_lignes("data/petite_notes_info.csv"))
+    ['90000003', '16.0']
+    """
+    if not os.path.isfile(fichier):
+        raise FileNotFoundError(fichier)
+    with open(fichier, "r") as canal_fichier:
+        lignes = canal_fichier.readlines(TAILLE_TAMPON)
+        while lignes:
+            for ligne in lignes:
+                yield ligne.rstrip("\n").split(SEPARATEUR)
+            lignes = canal_fichier.readlines(TAILLE_TAMPON)
+
+def parcourir_notes(fichier):
+    """
+    Générateur des notes contenues dans ce fichier, chaque note étant représentée par un couple.
+    Version paresseuse de lire_liste_notes, utilisable directement par les fonctions reporter_notes.
+    
+    :param fichier: (str) le nom du fichier
+    :return: (generator) les couples (str, float)
+    
+    CU: Les notes du fichier doivent être de la forme NIP <SEPARATEUR> NOTE.
+        Lève FileNotFoundError si le fichier n'existe pas et ValueError si une note n'est pas un nombre.
+    
+    Exemple:
+    
+    >>> notes = parcourir_notes("data/petite_notes_maths.csv")
+    >>> next(notes), next(notes)
+    (('90000003', 5.5), ('11503156', 15.1))
+    """
+    for ligne_split in parcourir_lignes(fichier):
+        yield (ligne_split[0], float(ligne_split[1]))
+
+# On choisit un dictionnaire pour les notes comme cela il est beaucoup plus 
+# rapide de se référer à une note précise juste en donnant le nom de l'UE.
+
+def parcourir_etudiants(fichier, ues=None):
+    """
+    Générateur des étudiants décrits dans ce fichier, chaque étudiant étant représenté par un sextuplet.
+    Version paresseuse de lire_liste_etudiants.
+    
+    :param fichier: (str) le nom ou chemin du fichier
+    :param ues: (list) les UE des notes de chaque fiche, UES par défaut
+    :return: (generator) les fiches (NIP, NOM, PRENOM, PROFIL, GROUPE, NOTES)
+    
+    CU: Lève FileNotFoundError si le fichier n'existe pas et NameError si un profil n'est pas dans PROFILS
+    
+    Exemple:
+    
+    >>> next(parcourir_etudiants("data/petite_liste_etudiants.csv"))
+    ('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': None, 'info': None})
+    """
+    if ues == None:
+        ues = UES
+    for ligne_split in parcourir_lignes(fichier):
+        if not ligne_split[2] in PROFILS:
+            raise NameError
+        nom, prenom = ligne_split[1].split("- ")
+        notes = {}
+        for UE in ues:
+            notes[UE] = None
+        yield (ligne_split[0], nom, prenom, PROFILS[ligne_split[2]], ligne_split[3], notes)
 
 def lire_liste_notes(fichier):
     """
@@ -37,21 +342,13 @@ def lire_liste_notes(fichier):
     
     Exemples:
     
-    >>> lire_liste_notes("data\\petite_notes_info.csv")
+    >>> lire_liste_notes("data/petite_notes_info.csv")
     [('90000003', 16.0), ('11505350', 14.0), ('11503156', 11.3), ('11503442', 10.2), ('11400130', 0.0), ('11504200', 4.1), ('11403526', 12.3), ('11502148', 11.8), ('11501693', 11.1), ('90000004', 20.0), ('99990125', 12.2), ('99990179', 9.0), ('11402978', 10.4), ('90000002', 0.0)]
-    >>> lire_liste_notes("data\\petite_notes_maths.csv")
+    >>> lire_liste_notes("data/petite_notes_maths.csv")
     [('90000003', 5.5), ('11503156', 15.1), ('11500571', 10.2), ('11402978', 14.2), ('99990125', 11.8), ('11400130', 9.6), ('11403526', 10.3), ('11502148', 10.7), ('99990179', 7.5), ('11503188', 11.2), ('11503442', 8.2), ('11505350', 4.4), ('90000002', 0.0), ('90000004', 20.0)]
     """
     try:
-        if not os.path.isfile(fichier):
-            raise FileNotFoundError
-        with open(fichier, "r") as canal_fichier:
-            lignes = [ligne.rstrip("\n") for ligne in canal_fichier.readlines()]
-        notes = []
-        for ligne in lignes:
-            ligne_split = ligne.split(SEPARATEUR)
-            notes.append((ligne_split[0], float(ligne_split[1])))
-        return notes
+        return list(parcourir_notes(fichier))
     
     except FileNotFoundError:
         print("Fichier {0} inexistant".format(fichier))
@@ -59,9 +356,6 @@ def lire_liste_notes(fichier):
         print("Note du mauvais format (devrait être un nombre à point flottant") # On sait JAMAIS
         
         
-# On choisit un dictionnaire pour les notes comme cela il est beaucoup plus 
-# rapide de se référer à une note précise juste en donnant le nom de l'UE.
-
 def lire_liste_etudiants(fichier):
     """
     Renvoie la liste des étudiants décrits dans ce fichier, chaque étudiant étant représenté par un sextuplet.
@@ -73,32 +367,477 @@ def lire_liste_etudiants(fichier):
     
     Exemples:
     
-    >>> lire_liste_etudiants("data\\petite_liste_etudiants.csv")
+    >>> lire_liste_etudiants("data/petite_liste_etudiants.csv")
     [('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': None, 'info': None}), ('11500571', 'SPROCQ ', 'SIMON', 'SESI', '11', {'maths': None, 'info': None}), ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': None, 'info': None}), ('11403526', 'SBAI', 'WISSEM', 'SESI', '14', {'maths': None, 'info': None}), ('11502148', 'WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': None, 'info': None}), ('11402978', 'SOETE', 'CEDRIC', 'SESI', '34', {'maths': None, 'info': None}), ('11505350', 'NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': None, 'info': None}), ('11501693', 'VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': None}), ('11503188', 'DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': None, 'info': None}), ('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': None, 'info': None}), ('99990125', 'PERON', 'BENJAMIN', 'SESI', '41', {'maths': None, 'info': None}), ('90000004', 'CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': None, 'info': None}), ('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), ('11504200', 'GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': None}), ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': None, 'info': None}), ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': None, 'info': None}), ('11503156', 'NAGET', 'ARTHUR', 'SESI', '42', {'maths': None, 'info': None})]
 
     """
     try:
-        if not os.path.isfile(fichier):
-            raise FileNotFoundError
-        with open(fichier, "r") as canal_fichier:
-            lignes = [ligne.rstrip("\n") for ligne in canal_fichier.readlines()]
-        liste_etudiants = []
-        for ligne in lignes:
-            ligne_split = ligne.split(SEPARATEUR)
-            if not ligne_split[2] in PROFILS:
-                raise NameError
-            nom, prenom = ligne_split[1].split("- ")
-            notes = {}
-            for UE in UES:
-                notes[UE] = None
-            liste_etudiants.append((ligne_split[0], nom, prenom, PROFILS[ligne_split[2]], ligne_split[3], notes))
-        return liste_etudiants
+        return list(parcourir_etudiants(fichier))
     except FileNotFoundError:
         print("fichier {0} inexistant".format(fichier))
     except NameError:
         print("Le profil n'a pas été reconnu")
             
 
+class NotesBrutes(Sequence):
+    """
+    Notes d'une UE lues par lire_notes_mmap : les NIP sont rangés à largeur fixe dans un seul bytearray
+    (complétés par des octets nuls) et les notes dans un array('d').
+    
+    S'utilise comme la liste de couples (NIP, note) renvoyée par lire_liste_notes, par exemple avec reporter_notes4 ou joindre_notes.
+    
+    Exemple:
+    
+    >>> notes = NotesBrutes(bytearray(b"123\\x004567"), 4, array("d", [12.5, 8.0]))
+    >>> len(notes), notes[0], notes[-1]
+    (2, ('123', 12.5), ('4567', 8.0))
+    """
+
+    def __init__(self, nips, largeur, notes):
+        """
+        :param nips: (bytearray) les NIP, chacun sur largeur octets
+        :param largeur: (int) la largeur d'un NIP
+        :param notes: (array) les notes
+        """
+        self.nips = nips
+        self.largeur = largeur
+        self.notes = notes
+
+    def __len__(self):
+        return len(self.notes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        debut = indice * self.largeur
+        NIP = self.nips[debut:debut + self.largeur].rstrip(b"\0").decode()
+        return (NIP, self.notes[indice])
+
+    def __eq__(self, autre):
+        return list(self) == list(autre)
+
+    def __repr__(self):
+        return repr(list(self))
+
+def lire_notes_mmap(fichier):
+    """
+    Renvoie les notes contenues dans ce fichier, comme lire_liste_notes, mais sans passer par des chaînes de caractères.
+    Le fichier est projeté en mémoire (mmap) et découpé par blocs d'octets selon les fins de ligne et SEPARATEUR.
+    Les notes sont converties directement dans un array('d') alloué d'avance et les NIP copiés dans un bytearray à largeur fixe.
+    
+    :param fichier: (str) le nom du fichier
+    :return: (NotesBrutes)
+    
+    CU: Les notes du fichier doivent être de la forme NIP <SEPARATEUR> NOTE. Les NIP ne contiennent pas d'octet nul.
+        Comme lire_liste_notes, affiche un message et renvoie None si le fichier n'existe pas ou si une note n'est pas un nombre.
+    
+    Exemples:
+    
+    >>> lire_notes_mmap("data/petite_notes_info.csv") == lire_liste_notes("data/petite_notes_info.csv")
+    True
+    >>> lire_notes_mmap("data/petite_notes_maths.csv")[:2]
+    [('90000003', 5.5), ('11503156', 15.1)]
+    """
+    try:
+        return projeter_notes(fichier)
+    except FileNotFoundError:
+        print("Fichier {0} inexistant".format(fichier))
+    except ValueError:
+        print("Note du mauvais format (devrait être un nombre à point flottant") # On sait JAMAIS
+
+def projeter_notes(fichier):
+    """
+    Renvoie les NotesBrutes contenues dans ce fichier, comme lire_notes_mmap, mais en laissant passer les erreurs.
+    
+    :param fichier: (str) le nom du fichier
+    :return: (NotesBrutes)
+    
+    CU: Lève FileNotFoundError si le fichier n'existe pas et ValueError si une note n'est pas un nombre
+    """
+    if not os.path.isfile(fichier):
+        raise FileNotFoundError(fichier)
+    with open(fichier, "rb") as canal_fichier:
+        taille = os.fstat(canal_fichier.fileno()).st_size
+        if taille == 0: # mmap refuse les fichiers vides
+            return NotesBrutes(bytearray(), 1, array("d"))
+        with mmap.mmap(canal_fichier.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+            return analyser_notes_mmap(projection, taille)
+
+def analyser_notes_mmap(projection, taille):
+    """
+    Analyse les octets d'un fichier de notes projeté en mémoire et renvoie les NotesBrutes correspondantes.
+    
+    :param projection: (mmap) le fichier projeté en mémoire
+    :param taille: (int) la taille du fichier en octets
+    :return: (NotesBrutes)
+    
+    CU: taille > 0. Lève ValueError si une note n'est pas un nombre et IndexError si une ligne n'a pas de SEPARATEUR,
+        comme lire_liste_notes.
+    
+    Exemples:
+    
+    >>> analyser_notes_mmap(b"90000001|12.5|1\\n90000002|8\\n", 27)
+    [('90000001', 12.5), ('90000002', 8.0)]
+    >>> analyser_notes_mmap(b"90000001|12.5|1\\n90000002\\n", 25)
+    Traceback (most recent call last):
+    ...
+    IndexError: list index out of range
+    >>> analyser_notes_mmap(b"11400130|12,5\\n11402978|8.0\\n\\n", 28)
+    Traceback (most recent call last):
+    ...
+    ValueError: could not convert string to float: b'12,5'
+    """
+    separateur = SEPARATEUR.encode()
+    nb_lignes = 0
+    for debut in range(0, taille, TAILLE_TAMPON):
+        nb_lignes += projection[debut:debut + TAILLE_TAMPON].count(b"\n")
+    if projection[taille - 1] != ord("\n"):
+        nb_lignes += 1 # Dernière ligne sans retour à la ligne
+    
+    notes = array("d", bytes(8 * nb_lignes)) # Alloué d'avance, rempli de 0.0
+    largeur = 1
+    nips = bytearray(nb_lignes * largeur)
+    nb_lues = 0
+    debut = 0
+    while debut < taille:
+        # Bloc d'environ TAILLE_TAMPON octets, coupé après un retour à la ligne
+        fin = projection.rfind(b"\n", debut, debut + TAILLE_TAMPON) + 1
+        if fin <= debut:
+            fin = projection.find(b"\n", debut + TAILLE_TAMPON) + 1 or taille
+        bloc = projection[debut:fin]
+        lignes = bloc.split(b"\n")
+        if lignes[-1] == b"":
+            lignes.pop()
+        separateurs = list(map(bytes.count, lignes, itertools.repeat(separateur)))
+        if separateurs.count(1) == len(lignes):
+            # Exactement un SEPARATEUR sur chaque ligne : un seul découpage donne NIP, note, NIP, note...
+            champs = bloc.rstrip(b"\n").replace(separateur, b"\n").split(b"\n")
+            nips_bloc, notes_bloc = champs[0::2], array("d", map(float, champs[1::2]))
+        else:
+            # Ligne par ligne, comme lire_liste_notes : la première erreur du fichier décide de l'exception,
+            # IndexError pour une ligne sans SEPARATEUR, ValueError pour une note qui n'est pas un nombre
+            nips_bloc, notes_bloc = [], array("d")
+            for ligne in lignes:
+                champs = ligne.split(separateur)
+                nips_bloc.append(champs[0])
+                notes_bloc.append(float(champs[1])) # Champs en trop ignorés
+        notes[nb_lues:nb_lues + len(notes_bloc)] = notes_bloc
+        
+        largeur_bloc = max(map(len, nips_bloc))
+        if largeur_bloc > largeur:
+            # NIP plus long que les précédents : on élargit les cases déjà remplies
+            nips = bytearray(b"".join(nips[k * largeur:(k + 1) * largeur].ljust(largeur_bloc, b"\0")
+                                      for k in range(nb_lues)))
+            nips.extend(bytes((nb_lignes - nb_lues) * largeur_bloc))
+            largeur = largeur_bloc
+        if min(map(len, nips_bloc)) == largeur:
+            nips_bloc = b"".join(nips_bloc)
+        else:
+            nips_bloc = b"".join(nip.ljust(largeur, b"\0") for nip in nips_bloc)
+        nips[nb_lues * largeur:nb_lues * largeur + len(nips_bloc)] = nips_bloc
+        nb_lues += len(notes_bloc)
+        debut = fin
+    return NotesBrutes(nips, largeur, notes)
+
+class NotesEtudiant(MutableMapping):
+    """
+    Vue sur les notes d'un étudiant d'une Promo, utilisable comme le dictionnaire NOTES d'une fiche.
+    Lire ou modifier une note lit ou modifie directement la colonne de l'UE dans la Promo.
+    
+    Exemple:
+    
+    >>> promo = Promo([('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': 9.6, 'info': None})])
+    >>> notes = promo[0][5]
+    >>> notes
+    {'maths': 9.6, 'info': None}
+    >>> notes['info'] = 12.0
+    >>> promo.notes['info'][0]
+    12.0
+    >>> notes == {'maths': 9.6, 'info': 12.0}
+    True
+    """
+    __slots__ = ("promo", "indice")
+
+    def __init__(self, promo, indice):
+        self.promo = promo
+        self.indice = indice
+
+    def __getitem__(self, UE):
+        note = self.promo.notes[UE][self.indice]
+        if note != note: # NaN : pas de note
+            return None
+        return note
+
+    def __setitem__(self, UE, note):
+        if not UE in self.promo.notes:
+            self.promo.ajouter_ue(UE)
+        if note == None:
+            note = NAN
+        self.promo.modifier_note(self.indice, UE, note)
+
+    def __delitem__(self, UE):
+        self.promo.modifier_note(self.indice, UE, NAN)
+
+    def __iter__(self):
+        return iter(self.promo.notes)
+
+    def __len__(self):
+        return len(self.promo.notes)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class Promo(MutableSequence):
+    """
+    Liste d'étudiants stockée par colonnes : une liste par champ de la fiche et un array('d') de notes par UE.
+    Une note absente vaut NaN dans les colonnes de notes.
+    
+    Une Promo s'utilise comme une liste de fiches (NIP, NOM, PRENOM, PROFIL, GROUPE, NOTES) : promo[i]
+    construit la fiche à la demande, NOTES étant une vue NotesEtudiant sur les colonnes de notes.
+    Les fonctions reporter_notes, trie_liste_etudiants, resultat et ecrire_notes acceptent donc une Promo.
+    
+    Des abonnés (comme Statistiques) peuvent être ajoutés à promo.abonnes : leur méthode note_modifiee est appelée
+    à chaque note modifiée par modifier_note, et promo_modifiee quand des étudiants ou des UE sont ajoutés, remplacés ou supprimés.
+    Le tri ne les prévient pas : l'ordre des étudiants ne change ni leurs notes ni leurs résultats.
+    
+    Exemple:
+    
+    >>> promo = lire_promo("data/petite_liste_etudiants.csv")
+    >>> len(promo), promo.ues
+    (17, ['maths', 'info'])
+    >>> promo[0]
+    ('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': None, 'info': None})
+    >>> reporter_notes4(UES[1], promo, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes4(UES[0], promo, lire_liste_notes("data/petite_notes_maths.csv"))
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> reporter_notes4(UES[1], liste_etudiants, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes4(UES[0], liste_etudiants, lire_liste_notes("data/petite_notes_maths.csv"))
+    >>> promo == liste_etudiants
+    True
+    >>> trie_liste_etudiants(promo)
+    >>> trie_liste_etudiants(liste_etudiants)
+    >>> promo == liste_etudiants
+    True
+    """
+
+    def __init__(self, etudiants=(), ues=None):
+        """
+        :param etudiants: (iterable) des fiches d'étudiants (NIP, NOM, PRENOM, PROFIL, GROUPE, NOTES)
+        :param ues: (list) les UE de la promo, UES par défaut
+        """
+        if ues == None:
+            ues = UES
+        self.nips = []
+        self.noms = []
+        self.prenoms = []
+        self.profils = array("B") # Indices dans LISTE_PROFILS
+        self.groupes = []
+        self.notes = {UE: array("d") for UE in ues}
+        self.abonnes = []
+        self.cache_resultats = None # Voir activer_cache_resultats
+        self.extend(etudiants)
+
+    def __getstate__(self):
+        etat = dict(self.__dict__)
+        del etat["abonnes"] # Les abonnés ne sont pas sauvegardés avec la promo
+        etat.pop("cache_resultats", None)
+        return etat
+
+    def __setstate__(self, etat):
+        self.__dict__.update(etat)
+        self.abonnes = []
+        self.cache_resultats = None
+
+    @property
+    def ues(self):
+        return list(self.notes)
+
+    def ajouter_ue(self, UE):
+        """
+        Ajoute une colonne de notes, vide, pour l'UE donnée.
+        
+        :param UE: (str) le nom de l'UE
+        :return: None
+        """
+        self.notes[UE] = array("d", [NAN]) * len(self)
+        self.prevenir_abonnes()
+
+    def modifier_note(self, indice, UE, note):
+        """
+        Ecrit la note d'une UE de l'étudiant à l'indice donné et prévient les abonnés.
+        Si un abonné refuse la note (en levant une exception), l'ancienne note est remise,
+        les abonnés sont remis à jour par promo_modifiee et l'exception est propagée.
+        
+        :param indice: (int) la position de l'étudiant
+        :param UE: (str) l'UE, qui doit avoir une colonne
+        :param note: (float) la note, NaN si elle est absente
+        :return: None
+        """
+        colonne = self.notes[UE]
+        if self.abonnes:
+            ancienne = colonne[indice]
+            colonne[indice] = note
+            try:
+                for abonne in self.abonnes:
+                    abonne.note_modifiee(self, indice, UE, ancienne, note)
+            except Exception:
+                colonne[indice] = ancienne
+                self.prevenir_abonnes()
+                raise
+        else:
+            colonne[indice] = note
+
+    def prevenir_abonnes(self):
+        """
+        Prévient les abonnés que des étudiants ou des UE ont changé.
+        """
+        for abonne in self.abonnes:
+            abonne.promo_modifiee(self)
+
+    def __len__(self):
+        return len(self.nips)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        return (self.nips[indice], self.noms[indice], self.prenoms[indice],
+                LISTE_PROFILS[self.profils[indice]], self.groupes[indice], NotesEtudiant(self, indice))
+
+    def __setitem__(self, indice, etudiant):
+        if isinstance(indice, slice):
+            etudiants = [copie_etudiant(e) for e in self]
+            etudiants[indice] = [copie_etudiant(e) for e in etudiant]
+            abonnes, self.abonnes = self.abonnes, [] # Prévenus une seule fois, à la fin
+            self.clear()
+            self.extend(etudiants)
+            self.abonnes = abonnes
+            self.prevenir_abonnes()
+            return
+        if indice < 0:
+            indice += len(self)
+        etudiant = copie_etudiant(etudiant)
+        self.nips[indice] = etudiant[0]
+        self.noms[indice] = etudiant[1]
+        self.prenoms[indice] = etudiant[2]
+        self.profils[indice] = LISTE_PROFILS.index(etudiant[3])
+        self.groupes[indice] = sys.intern(etudiant[4])
+        for UE in self.notes:
+            self.notes[UE][indice] = NAN
+        NotesEtudiant(self, indice).update(etudiant[5])
+        self.prevenir_abonnes()
+
+    def __delitem__(self, indice):
+        del self.nips[indice]
+        del self.noms[indice]
+        del self.prenoms[indice]
+        del self.profils[indice]
+        del self.groupes[indice]
+        for UE in self.notes:
+            del self.notes[UE][indice]
+        self.prevenir_abonnes()
+
+    def insert(self, indice, etudiant):
+        etudiant = copie_etudiant(etudiant)
+        self.nips.insert(indice, etudiant[0])
+        self.noms.insert(indice, etudiant[1])
+        self.prenoms.insert(indice, etudiant[2])
+        self.profils.insert(indice, LISTE_PROFILS.index(etudiant[3]))
+        self.groupes.insert(indice, sys.intern(etudiant[4]))
+        for UE in self.notes:
+            self.notes[UE].insert(indice, NAN)
+        if indice < 0:
+            indice += len(self) - 1
+        NotesEtudiant(self, min(indice, len(self) - 1)).update(etudiant[5])
+        self.prevenir_abonnes()
+
+    def append(self, etudiant):
+        self.insert(len(self), etudiant)
+
+    def extend(self, etudiants):
+        """
+        Ajoute des étudiants à la fin de la promo. Les abonnés ne sont prévenus qu'une fois, à la fin,
+        et non à chaque étudiant comme avec append.
+        """
+        if etudiants is self:
+            etudiants = list(etudiants)
+        abonnes, self.abonnes = self.abonnes, []
+        nb_etudiants = len(self)
+        try:
+            for etudiant in etudiants:
+                self.insert(len(self), etudiant)
+        finally:
+            self.abonnes = abonnes
+            if len(self) != nb_etudiants:
+                self.prevenir_abonnes()
+
+    def clear(self):
+        abonnes, cache_resultats = self.abonnes, self.cache_resultats
+        self.__init__((), self.ues)
+        self.abonnes, self.cache_resultats = abonnes, cache_resultats
+        self.prevenir_abonnes()
+
+    def sort(self, key=None, reverse=False):
+        """
+        Trie la promo en place, comme list.sort : les colonnes sont réordonnées selon la permutation triée.
+        """
+        if key == None:
+            ordre = sorted(range(len(self)), key=lambda i: self[i], reverse=reverse)
+        else:
+            ordre = sorted(range(len(self)), key=lambda i: key(self[i]), reverse=reverse)
+        self.nips = [self.nips[i] for i in ordre]
+        self.noms = [self.noms[i] for i in ordre]
+        self.prenoms = [self.prenoms[i] for i in ordre]
+        self.profils = array("B", [self.profils[i] for i in ordre])
+        self.groupes = [self.groupes[i] for i in ordre]
+        for UE in self.notes:
+            colonne = self.notes[UE]
+            self.notes[UE] = array("d", [colonne[i] for i in ordre])
+
+    def __eq__(self, autre):
+        return list(self) == list(autre)
+
+    def __repr__(self):
+        return repr(list(self))
+
+def copie_etudiant(etudiant):
+    """
+    Renvoie une copie de la fiche d'un étudiant, indépendante d'une éventuelle Promo.
+    
+    :param etudiant: (tuple) une fiche d'étudiant
+    :return: (tuple) la même fiche, dont les notes sont un dictionnaire
+    
+    CU: any
+    """
+    return etudiant[:5] + (dict(etudiant[5]),)
+
+def lire_promo(fichier):
+    """
+    Renvoie la Promo des étudiants décrits dans ce fichier.
+    Version par colonnes de lire_liste_etudiants.
+    
+    :param fichier: (str) le nom ou chemin du fichier
+    :return: (Promo)
+    
+    CU: any
+    
+    Exemple:
+    
+    >>> lire_promo("data/petite_liste_etudiants.csv") == lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    True
+    """
+    try:
+        return Promo(parcourir_etudiants(fichier))
+    except FileNotFoundError:
+        print("fichier {0} inexistant".format(fichier))
+    except NameError:
+        print("Le profil n'a pas été reconnu")
+
 def reporter_notes1(UE, liste_etudiants, liste_notes):
     """
     Modifie les étudiants de la liste en reportant la note trouvée dans la liste de notes s'ils en ont une.
@@ -113,9 +852,9 @@ def reporter_notes1(UE, liste_etudiants, liste_notes):
     
     Exemple:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
-    >>> reporter_notes1(UES[1], liste_etudiants, lire_liste_notes("data\\petite_notes_info.csv"))
-    >>> reporter_notes1(UES[0], liste_etudiants, lire_liste_notes("data\\petite_notes_maths.csv"))
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> reporter_notes1(UES[1], liste_etudiants, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes1(UES[0], liste_etudiants, lire_liste_notes("data/petite_notes_maths.csv"))
     >>> print(liste_etudiants)
     [('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': 7.5, 'info': 9.0}), ('11500571', 'SPROCQ ', 'SIMON', 'SESI', '11', {'maths': 10.2, 'info': None}), ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': 0.0, 'info': 0.0}), ('11403526', 'SBAI', 'WISSEM', 'SESI', '14', {'maths': 10.3, 'info': 12.3}), ('11502148', 'WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': 10.7, 'info': 11.8}), ('11402978', 'SOETE', 'CEDRIC', 'SESI', '34', {'maths': 14.2, 'info': 10.4}), ('11505350', 'NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': 4.4, 'info': 14.0}), ('11501693', 'VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': 11.1}), ('11503188', 'DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': 11.2, 'info': None}), ('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': 9.6, 'info': 0.0}), ('99990125', 'PERON', 'BENJAMIN', 'SESI', '41', {'maths': 11.8, 'info': 12.2}), ('90000004', 'CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': 20.0, 'info': 20.0}), ('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), ('11504200', 'GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': 4.1}), ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': 5.5, 'info': 16.0}), ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': 8.2, 'info': 10.2}), ('11503156', 'NAGET', 'ARTHUR', 'SESI', '42', {'maths': 15.1, 'info': 11.3})]
     """
@@ -139,18 +878,19 @@ def reporter_notes2(UE, liste_etudiants, liste_notes):
     
     Exemple:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
     >>> liste_etudiants.sort()
-    >>> reporter_notes2(UES[1], liste_etudiants, lire_liste_notes("data\\petite_notes_info.csv"))
-    >>> reporter_notes2(UES[0], liste_etudiants, lire_liste_notes("data\\petite_notes_maths.csv"))
+    >>> reporter_notes2(UES[1], liste_etudiants, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes2(UES[0], liste_etudiants, lire_liste_notes("data/petite_notes_maths.csv"))
     >>> print(liste_etudiants)
     [('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': 9.6, 'info': 0.0}), ('11402978', 'SOETE', 'CEDRIC', 'SESI', '34', {'maths': 14.2, 'info': 10.4}), ('11403526', 'SBAI', 'WISSEM', 'SESI', '14', {'maths': 10.3, 'info': 12.3}), ('11500571', 'SPROCQ ', 'SIMON', 'SESI', '11', {'maths': 10.2, 'info': None}), ('11501693', 'VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': 11.1}), ('11502148', 'WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': 10.7, 'info': 11.8}), ('11503156', 'NAGET', 'ARTHUR', 'SESI', '42', {'maths': 15.1, 'info': 11.3}), ('11503188', 'DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': 11.2, 'info': None}), ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': 8.2, 'info': 10.2}), ('11504200', 'GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': 4.1}), ('11505350', 'NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': 4.4, 'info': 14.0}), ('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': 0.0, 'info': 0.0}), ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': 5.5, 'info': 16.0}), ('90000004', 'CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': 20.0, 'info': 20.0}), ('99990125', 'PERON', 'BENJAMIN', 'SESI', '41', {'maths': 11.8, 'info': 12.2}), ('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': 7.5, 'info': 9.0})]
+    >>> reporter_notes2(UES[1], liste_etudiants, [('00000000', 1.0), ('11450000', 1.0), ('99999999', 1.0)]) # NIP inconnus : notes ignorées
 
     """
     
     for couple_note in liste_notes:
         a, b = 0, len(liste_etudiants)-1
-        while True:
+        while a <= b: # Si a > b, le NIP n'est pas dans la liste : la note est ignorée
             NIP_etudiant = liste_etudiants[(a+b)//2][0]
             if NIP_etudiant < couple_note[0]:
                 a = (a+b)//2 + 1
@@ -174,19 +914,21 @@ def reporter_notes3(UE, liste_etudiants, liste_notes):
     
     Exemple:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
     >>> liste_etudiants.sort()
-    >>> reporter_notes3(UES[1], liste_etudiants, sorted(lire_liste_notes("data\\petite_notes_info.csv")))
-    >>> reporter_notes3(UES[0], liste_etudiants, sorted(lire_liste_notes("data\\petite_notes_maths.csv")))
+    >>> reporter_notes3(UES[1], liste_etudiants, sorted(lire_liste_notes("data/petite_notes_info.csv")))
+    >>> reporter_notes3(UES[0], liste_etudiants, sorted(lire_liste_notes("data/petite_notes_maths.csv")))
     >>> print(liste_etudiants)
     [('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': 9.6, 'info': 0.0}), ('11402978', 'SOETE', 'CEDRIC', 'SESI', '34', {'maths': 14.2, 'info': 10.4}), ('11403526', 'SBAI', 'WISSEM', 'SESI', '14', {'maths': 10.3, 'info': 12.3}), ('11500571', 'SPROCQ ', 'SIMON', 'SESI', '11', {'maths': 10.2, 'info': None}), ('11501693', 'VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': 11.1}), ('11502148', 'WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': 10.7, 'info': 11.8}), ('11503156', 'NAGET', 'ARTHUR', 'SESI', '42', {'maths': 15.1, 'info': 11.3}), ('11503188', 'DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': 11.2, 'info': None}), ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': 8.2, 'info': 10.2}), ('11504200', 'GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': 4.1}), ('11505350', 'NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': 4.4, 'info': 14.0}), ('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': 0.0, 'info': 0.0}), ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': 5.5, 'info': 16.0}), ('90000004', 'CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': 20.0, 'info': 20.0}), ('99990125', 'PERON', 'BENJAMIN', 'SESI', '41', {'maths': 11.8, 'info': 12.2}), ('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': 7.5, 'info': 9.0})]
+    >>> reporter_notes3(UES[1], liste_etudiants, [('00000000', 1.0), ('11450000', 1.0), ('99999999', 1.0)]) # NIP inconnus : notes ignorées
     """
     last_index = 0
     for couple_note in liste_notes:
-        while liste_etudiants[last_index][0] != couple_note[0]:
+        while last_index < len(liste_etudiants) and liste_etudiants[last_index][0] < couple_note[0]:
             last_index += 1
-        liste_etudiants[last_index][5][UE] = couple_note[1]
-        last_index += 1
+        if last_index < len(liste_etudiants) and liste_etudiants[last_index][0] == couple_note[0]:
+            liste_etudiants[last_index][5][UE] = couple_note[1]
+        # Sinon le NIP n'est pas dans la liste : la note est ignorée
 
 def liste_en_dico(liste):
     """
@@ -197,7 +939,7 @@ def liste_en_dico(liste):
     
     Exemple:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
     >>> liste_en_dico(liste_etudiants)
     {'99990179': ('HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': None, 'info': None}), '11500571': ('SPROCQ ', 'SIMON', 'SESI', '11', {'maths': None, 'info': None}), '90000002': ('CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': None, 'info': None}), '11403526': ('SBAI', 'WISSEM', 'SESI', '14', {'maths': None, 'info': None}), '11502148': ('WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': None, 'info': None}), '11402978': ('SOETE', 'CEDRIC', 'SESI', '34', {'maths': None, 'info': None}), '11505350': ('NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': None, 'info': None}), '11501693': ('VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': None}), '11503188': ('DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': None, 'info': None}), '11400130': ('SOUAISSA', 'AMZA', 'MASS', '2', {'maths': None, 'info': None}), '99990125': ('PERON', 'BENJAMIN', 'SESI', '41', {'maths': None, 'info': None}), '90000004': ('CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': None, 'info': None}), '90000001': ('CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), '11504200': ('GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': None}), '90000003': ('CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': None, 'info': None}), '11503442': ('BEAU', 'CORENTIN', 'PEIP', '13', {'maths': None, 'info': None}), '11503156': ('NAGET', 'ARTHUR', 'SESI', '42', {'maths': None, 'info': None})}
 
@@ -221,9 +963,9 @@ def reporter_notes4(UE, liste_etudiants, liste_notes):
     
     Exemple:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
-    >>> reporter_notes4(UES[1], liste_etudiants, lire_liste_notes("data\\petite_notes_info.csv"))
-    >>> reporter_notes4(UES[0], liste_etudiants, lire_liste_notes("data\\petite_notes_maths.csv"))
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> reporter_notes4(UES[1], liste_etudiants, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes4(UES[0], liste_etudiants, lire_liste_notes("data/petite_notes_maths.csv"))
     >>> print(liste_etudiants)
     [('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': 7.5, 'info': 9.0}), ('11500571', 'SPROCQ ', 'SIMON', 'SESI', '11', {'maths': 10.2, 'info': None}), ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': 0.0, 'info': 0.0}), ('11403526', 'SBAI', 'WISSEM', 'SESI', '14', {'maths': 10.3, 'info': 12.3}), ('11502148', 'WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': 10.7, 'info': 11.8}), ('11402978', 'SOETE', 'CEDRIC', 'SESI', '34', {'maths': 14.2, 'info': 10.4}), ('11505350', 'NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': 4.4, 'info': 14.0}), ('11501693', 'VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': 11.1}), ('11503188', 'DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': 11.2, 'info': None}), ('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': 9.6, 'info': 0.0}), ('99990125', 'PERON', 'BENJAMIN', 'SESI', '41', {'maths': 11.8, 'info': 12.2}), ('90000004', 'CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': 20.0, 'info': 20.0}), ('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), ('11504200', 'GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': 4.1}), ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': 5.5, 'info': 16.0}), ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': 8.2, 'info': 10.2}), ('11503156', 'NAGET', 'ARTHUR', 'SESI', '42', {'maths': 15.1, 'info': 11.3})]
     """
@@ -233,80 +975,619 @@ def reporter_notes4(UE, liste_etudiants, liste_notes):
     # Quand on modifie les valeurs de dict_etudiants, les valeurs associées dans liste_etudiants sont également modifiée
     # Il est alors non nécessaire de transformer dict_etudiants en liste après le report
 
-def resultat(note_etudiant):
+def index_nips(liste_etudiants):
     """
-    Renvoie un couple (moyenne, mention) correspondant aux notes d'un étudiant
+    Renvoie un dictionnaire qui associe à chaque NIP la position de l'étudiant dans la liste.
+    Contrairement à liste_en_dico, l'index ne contient que des entiers et peut être sauvegardé tel quel.
     
-    :param note_etudiant: (dict) un dictionnaire contenant les notes d'un étudiant
-    :return: ((float, str)) le couple (moyenne, mention)
+    :param liste_etudiants: (list) une liste de fiches d'étudiants ou une Promo
+    :return: (dict) le dictionnaire {NIP: position}
     
-    CU: Utilise la constante MENTIONS
+    CU: any
     
-    Exemples:
+    Exemple:
     
-    >>> resultat ({'maths': None, 'info': None})
-    (None, 'Absent')
-    >>> resultat ({'maths': 12, 'info': None})
-    (6.0, 'Ajourné')
-    >>> resultat ({'maths': None, 'info': 15})
-    (7.5, 'Ajourné')
-    >>> resultat ({'maths': 9, 'info': 12})
-    (10.5, 'Passable')
-    >>> resultat ({'maths': 15, 'info': 12})
-    (13.5, 'AB')
-    >>> resultat ({'maths': 15, 'info': 16})
-    (15.5, 'B')
-    >>> resultat ({'maths': 18, 'info': 16})
-    (17.0, 'TB')
+    >>> index = index_nips(lire_promo("data/petite_liste_etudiants.csv"))
+    >>> index['99990179'], index['11503156']
+    (0, 16)
     """
-    somme = 0
-    liste_notes = []
-    for UE in note_etudiant:
-        if note_etudiant[UE] != None:
-            somme += note_etudiant[UE]
-        else:
-            liste_notes.append(note_etudiant[UE])
-    
-    if len(liste_notes) == len(note_etudiant):
-        return (None, MENTIONS[0])
-    moy = round(somme / len(note_etudiant), 3) # Arrondi 3 chiffres après la virgule 
-    if moy < 10:
-        mention = MENTIONS[1]
-    elif moy < 12:
-        mention = MENTIONS[2]
-    elif moy < 14:
-        mention = MENTIONS[3]
-    elif moy < 16:
-        mention = MENTIONS[4]
-    else:
-        mention = MENTIONS[5]
-
-    return moy, mention
-
+    if isinstance(liste_etudiants, Promo):
+        return {NIP: i for i, NIP in enumerate(liste_etudiants.nips)}
+    return {etudiant[0]: i for i, etudiant in enumerate(liste_etudiants)}
 
-def compare_etudiant_admin(etudiant1, etudiant2):
+def nips_liste(liste_etudiants):
     """
-    Compare deux étudiants sur les critères administratifs
+    Renvoie la liste des NIP d'une liste d'étudiants, dans le même ordre.
     
-    Critères
-    ========
+    :param liste_etudiants: (list) une liste de fiches d'étudiants ou une Promo
+    :return: ([str]) les NIP
     
-    :premier critère: les étudiants doivent être regroupés par profils. Les profils apparaissent dans l’ordre lexicographique (avec notre exemple doivent figurer en premier les LICAM, puis les MASS, puis les PEIP et enfin les SESI).
-    :deuxième critère: au sein d’un profil, les étudiants doivent être classés par ordre lexicographique des noms.
-    :troisième critère: en cas d’homonymie (mêmes noms) c’est l’ordre lexicographique des prénoms qui compte.
-    :quatrième critère: en cas d’homonymie complète (mêmes noms et prénoms [3]) c’est l’ordre lexicographique des NIP qui compte.
+    CU: any
+    """
+    if isinstance(liste_etudiants, Promo):
+        return liste_etudiants.nips
+    return [etudiant[0] for etudiant in liste_etudiants]
 
-    Paramètres
-    ==========
+def choisir_methode_jointure(nb_etudiants, nips_tries, liste_notes):
+    """
+    Renvoie la méthode de report la plus adaptée aux tailles et à l'ordre des listes :
+    
+    - "dichotomie" (comme reporter_notes2) si les étudiants sont triés par NIP et qu'il y a peu de notes ;
+    - "fusion" (comme reporter_notes3) si les étudiants et les notes sont triés par NIP ;
+    - "dico" (comme reporter_notes4) sinon, ou si les notes arrivent d'un générateur.
+    
+    :param nb_etudiants: (int) le nombre d'étudiants
+    :param nips_tries: (bool) True si les étudiants sont triés par NIP croissants
+    :param liste_notes: (list) une liste de notes (couples NIP, note), ou un itérable quelconque
+    :return: (str) "dichotomie", "fusion" ou "dico"
+    
+    CU: any
+    
+    Exemples:
+    
+    >>> choisir_methode_jointure(100000, True, [('11400130', 9.6)])
+    'dichotomie'
+    >>> choisir_methode_jointure(4, True, [('1', 9.6), ('2', 10.0), ('3', 12.0)])
+    'fusion'
+    >>> choisir_methode_jointure(4, False, [('1', 9.6), ('2', 10.0), ('3', 12.0)])
+    'dico'
+    """
+    if not nips_tries or not isinstance(liste_notes, list):
+        return "dico"
+    if len(liste_notes) * math.log2(nb_etudiants + 1) < nb_etudiants:
+        return "dichotomie"
+    if all(liste_notes[i][0] <= liste_notes[i+1][0] for i in range(len(liste_notes)-1)):
+        return "fusion"
+    return "dico"
+
+def joindre_notes(liste_etudiants, notes_par_ue, methode=None, index=None):
+    """
+    Reporte les notes de plusieurs UE dans une liste d'étudiants et renvoie un rapport sur les notes non reportées.
+    
+    Pour chaque UE, la méthode est choisie par choisir_methode_jointure, sauf si methode est donnée.
+    L'index des NIP (méthode "dico") n'est construit qu'une fois pour toutes les UE.
+    Une note dont le NIP n'est pas dans la liste est ignorée et signalée dans rapport["orphelins"].
+    Un NIP présent plusieurs fois dans les notes d'une UE est signalé dans rapport["doublons"] : la dernière note est gardée, comme avec reporter_notes4.
+    
+    :param liste_etudiants: (list) une liste d'étudiants valide (NIP, NOM, PRENOM, PROFIL, GROUPE, NOTES) ou une Promo
+    :param notes_par_ue: (dict) les listes de notes (couples NIP, note) de chaque UE {UE: liste_notes}
+    :param methode: (str) "dico", "dichotomie" ou "fusion" pour imposer la méthode, None pour la choisir
+    :param index: (dict) un index des NIP déjà construit par index_nips, facultatif
+    :return: (dict) le rapport {"methodes": {UE: methode}, "orphelins": {UE: [NIP]}, "doublons": {UE: [NIP]}}
+    
+    CU: methode vaut None, "dico", "dichotomie" ou "fusion"
+    
+    Exemples:
+    
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> notes_info = lire_liste_notes("data/petite_notes_info.csv") + [('00000000', 12.0), ('90000003', 17.0)]
+    >>> rapport = joindre_notes(liste_etudiants, {"info": notes_info, "maths": lire_liste_notes("data/petite_notes_maths.csv")})
+    >>> rapport["orphelins"], rapport["doublons"]
+    ({'info': ['00000000'], 'maths': []}, {'info': ['90000003'], 'maths': []})
+    >>> liste_etudiants[14]
+    ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': 5.5, 'info': 17.0})
+    >>> for methode in ["dico", "dichotomie", "fusion"]:
+    ...     promo = lire_promo("data/petite_liste_etudiants.csv")
+    ...     rapport = joindre_notes(promo, {"info": notes_info, "maths": lire_liste_notes("data/petite_notes_maths.csv")}, methode)
+    ...     print(promo == liste_etudiants, rapport["orphelins"]["info"], rapport["doublons"]["info"])
+    True ['00000000'] ['90000003']
+    True ['00000000'] ['90000003']
+    True ['00000000'] ['90000003']
+    """
+    nips = nips_liste(liste_etudiants)
+    nips_tries = all(nips[i] <= nips[i+1] for i in range(len(nips)-1))
+    ordre = None # Positions des étudiants dans l'ordre des NIP, si la liste n'est pas triée
+    rapport = {"methodes": {}, "orphelins": {}, "doublons": {}}
+    for UE, liste_notes in notes_par_ue.items():
+        methode_ue = methode
+        if methode_ue == None:
+            methode_ue = choisir_methode_jointure(len(nips), nips_tries, liste_notes)
+        if methode_ue == "dico":
+            if index == None:
+                index = index_nips(liste_etudiants)
+            positions = ((couple_note, index.get(couple_note[0])) for couple_note in liste_notes)
+        else:
+            if not nips_tries and ordre == None:
+                ordre = sorted(range(len(nips)), key=nips.__getitem__)
+            if methode_ue == "dichotomie":
+                positions = positions_dichotomie(nips, ordre, liste_notes)
+            else:
+                positions = positions_fusion(nips, ordre, liste_notes)
+        
+        orphelins, doublons, vus = [], [], set()
+        for couple_note, position in positions:
+            if position == None:
+                orphelins.append(couple_note[0])
+                continue
+            if couple_note[0] in vus:
+                doublons.append(couple_note[0])
+            vus.add(couple_note[0])
+            ecrire_note(liste_etudiants, position, UE, couple_note[1])
+        rapport["methodes"][UE] = methode_ue
+        rapport["orphelins"][UE] = orphelins
+        rapport["doublons"][UE] = doublons
+    return rapport
+
+def positions_dichotomie(nips, ordre, liste_notes):
+    """
+    Générateur des couples (couple_note, position de l'étudiant) trouvés par recherche dichotomique, la position valant None si le NIP est inconnu.
+    
+    :param nips: ([str]) les NIP des étudiants
+    :param ordre: ([int]) les positions des étudiants dans l'ordre des NIP, ou None si nips est déjà trié
+    :param liste_notes: (iterable) les couples (NIP, note)
+    :return: (generator)
+    
+    CU: any
+    """
+    nips_tries = nips if ordre == None else [nips[i] for i in ordre]
+    for couple_note in liste_notes:
+        i = bisect.bisect_left(nips_tries, couple_note[0])
+        if i < len(nips_tries) and nips_tries[i] == couple_note[0]:
+            yield couple_note, (i if ordre == None else ordre[i])
+        else:
+            yield couple_note, None
+
+def positions_fusion(nips, ordre, liste_notes):
+    """
+    Générateur des couples (couple_note, position de l'étudiant) trouvés en avançant en parallèle dans les NIP et les notes triés,
+    la position valant None si le NIP est inconnu. Les notes sont triées par NIP (tri stable) si besoin.
+    
+    :param nips: ([str]) les NIP des étudiants
+    :param ordre: ([int]) les positions des étudiants dans l'ordre des NIP, ou None si nips est déjà trié
+    :param liste_notes: (iterable) les couples (NIP, note)
+    :return: (generator)
+    
+    CU: any
+    """
+    if ordre == None:
+        ordre = range(len(nips))
+    i = 0
+    for couple_note in sorted(liste_notes, key=itemgetter(0)):
+        while i < len(ordre) and nips[ordre[i]] < couple_note[0]:
+            i += 1
+        if i < len(ordre) and nips[ordre[i]] == couple_note[0]:
+            yield couple_note, ordre[i]
+        else:
+            yield couple_note, None
+
+def ecrire_note(liste_etudiants, position, UE, note):
+    """
+    Ecrit la note d'une UE de l'étudiant à la position donnée, directement dans la colonne de l'UE pour une Promo.
+    
+    :param liste_etudiants: (list) une liste de fiches d'étudiants ou une Promo
+    :param position: (int) la position de l'étudiant
+    :param UE: (str) l'UE
+    :param note: (float) la note
+    :return: None
+    
+    CU: 0 <= position < len(liste_etudiants)
+    """
+    if isinstance(liste_etudiants, Promo):
+        if not UE in liste_etudiants.notes:
+            liste_etudiants.ajouter_ue(UE)
+        liste_etudiants.modifier_note(position, UE, note)
+    else:
+        liste_etudiants[position][5][UE] = note
+
+def resultat(note_etudiant):
+    """
+    Renvoie un couple (moyenne, mention) correspondant aux notes d'un étudiant
+    Si des UE ont un coefficient différent de 1 dans COEFFICIENTS, la moyenne est pondérée (voir noyau_resultats).
+    
+    :param note_etudiant: (dict) un dictionnaire contenant les notes d'un étudiant
+    :return: ((float, str)) le couple (moyenne, mention)
+    
+    CU: Utilise les constantes MENTIONS et COEFFICIENTS
+    
+    Exemples:
+    
+    >>> resultat ({'maths': None, 'info': None})
+    (None, 'Absent')
+    >>> resultat ({'maths': 12, 'info': None})
+    (6.0, 'Ajourné')
+    >>> resultat ({'maths': None, 'info': 15})
+    (7.5, 'Ajourné')
+    >>> resultat ({'maths': 9, 'info': 12})
+    (10.5, 'Passable')
+    >>> resultat ({'maths': 15, 'info': 12})
+    (13.5, 'AB')
+    >>> resultat ({'maths': 15, 'info': 16})
+    (15.5, 'B')
+    >>> resultat ({'maths': 18, 'info': 16})
+    (17.0, 'TB')
+    >>> COEFFICIENTS["maths"] = 3
+    >>> resultat ({'maths': 15, 'info': 12})
+    (14.25, 'B')
+    >>> COEFFICIENTS["maths"] = 1
+    """
+    coefficients = coefficients_ues(note_etudiant)
+    if coefficients != None: # Moyenne pondérée
+        notes = [NAN if note == None else note for note in note_etudiant.values()]
+        return moyenne_et_mention(notes, len(note_etudiant), coefficients)
+    somme = 0
+    liste_notes = []
+    for UE in note_etudiant:
+        if note_etudiant[UE] != None:
+            somme += note_etudiant[UE]
+        else:
+            liste_notes.append(note_etudiant[UE])
+    
+    if len(liste_notes) == len(note_etudiant):
+        return (None, MENTIONS[0])
+    moy = round(somme / len(note_etudiant), 3) # Arrondi 3 chiffres après la virgule 
+    if moy < 10:
+        mention = MENTIONS[1]
+    elif moy < 12:
+        mention = MENTIONS[2]
+    elif moy < 14:
+        mention = MENTIONS[3]
+    elif moy < 16:
+        mention = MENTIONS[4]
+    else:
+        mention = MENTIONS[5]
+
+    return moy, mention
+
+def colonnes_notes(liste_etudiants):
+    """
+    Renvoie les colonnes de notes d'une liste d'étudiants, une par UE, une note absente valant NaN.
+    Pour une Promo, les colonnes sont renvoyées sans copie.
+    
+    :param liste_etudiants: (list) une liste de fiches d'étudiants ou une Promo
+    :return: ([array]) les array('d') des notes de chaque UE, dans l'ordre des UE des fiches
+    
+    CU: toutes les fiches ont les mêmes UE
+    
+    Exemple:
+    
+    >>> colonnes_notes([('1', 'A', 'B', 'SESI', '1', {'maths': 12.0, 'info': None})])
+    [array('d', [12.0]), array('d', [nan])]
+    """
+    if isinstance(liste_etudiants, Promo):
+        return list(liste_etudiants.notes.values())
+    if len(liste_etudiants) == 0:
+        return []
+    colonnes = []
+    for UE in liste_etudiants[0][5]:
+        notes = [etudiant[5][UE] for etudiant in liste_etudiants]
+        colonnes.append(array("d", [NAN if note == None else note for note in notes]))
+    return colonnes
+
+def importer_numpy():
+    """
+    Renvoie le module numpy, importé au premier appel seulement, ou None s'il n'est pas installé.
+    numpy est facultatif et long à importer : il n'est chargé que si des moyennes sont calculées.
+    
+    :return: (module) numpy ou None
+    
+    CU: any
+    """
+    global numpy, numpy_cherche
+    if not numpy_cherche:
+        numpy_cherche = True
+        try:
+            import numpy as module_numpy
+        except ImportError:
+            module_numpy = None
+        numpy = module_numpy
+    return numpy
+
+def resultats(liste_etudiants):
+    """
+    Renvoie les couples (moyenne, mention) de tous les étudiants de la liste, dans le même ordre.
+    Donne les mêmes résultats que resultat appliquée à chaque étudiant, mais calcule toutes les moyennes d'un coup,
+    UE par UE, sur la matrice des notes (avec numpy s'il est installé). La mention est trouvée par une recherche
+    dichotomique dans SEUILS_MENTIONS. Pour une Promo qui a un CacheResultats, seuls les résultats absents du cache sont calculés.
+    
+    :param liste_etudiants: (list) une liste de fiches d'étudiants ou une Promo
+    :return: ([(float, str)]) les couples (moyenne, mention)
+    
+    CU: toutes les fiches ont les mêmes UE
+    
+    Exemple:
+    
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> reporter_notes4(UES[1], liste_etudiants, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes4(UES[0], liste_etudiants, lire_liste_notes("data/petite_notes_maths.csv"))
+    >>> resultats(liste_etudiants)[:4]
+    [(8.25, 'Ajourné'), (5.1, 'Ajourné'), (0.0, 'Ajourné'), (11.3, 'Passable')]
+    >>> resultats(liste_etudiants) == [resultat(etudiant[5]) for etudiant in liste_etudiants]
+    True
+    """
+    if isinstance(liste_etudiants, Promo) and liste_etudiants.cache_resultats != None:
+        return liste_etudiants.cache_resultats.resultats()
+    if isinstance(liste_etudiants, Promo):
+        ues = liste_etudiants.ues
+    else:
+        ues = liste_etudiants[0][5] if len(liste_etudiants) > 0 else []
+    return resultats_colonnes(colonnes_notes(liste_etudiants), len(liste_etudiants), coefficients_ues(ues))
+
+def resultats_colonnes(colonnes, nb_etudiants, coefficients=None):
+    """
+    Renvoie les couples (moyenne, mention) des étudiants dont les notes sont données par colonnes, comme resultats.
+    
+    :param colonnes: ([array]) les array('d') des notes de chaque UE, comme renvoyées par colonnes_notes
+    :param nb_etudiants: (int) le nombre d'étudiants
+    :param coefficients: ([float]) les coefficients des UE, dans l'ordre des colonnes, None s'ils valent tous 1 (voir coefficients_ues)
+    :return: ([(float, str)]) les couples (moyenne, mention)
+    
+    CU: toutes les colonnes contiennent nb_etudiants notes
+    """
+    moyennes, mentions, absences = noyau_resultats(colonnes, nb_etudiants, coefficients)
+    return list(zip(moyennes, mentions))
+
+def noyau_resultats(colonnes, nb_etudiants, coefficients=None):
+    """
+    Calcule en un seul passage sur la matrice des notes la moyenne pondérée, la mention et le nombre d'UE sans note de chaque étudiant.
+    La matrice est donnée par ses colonnes array('d'), lues sans copie par numpy s'il est installé.
+    La moyenne est la somme des notes multipliées par le coefficient de leur UE, divisée par la somme des coefficients de toutes les UE,
+    arrondie au millième. Sans coefficients, les notes sont simplement additionnées et divisées par le nombre d'UE, comme dans resultat.
+    
+    :param colonnes: ([array]) les array('d') des notes de chaque UE, NaN pour une note absente
+    :param nb_etudiants: (int) le nombre d'étudiants
+    :param coefficients: ([float]) les coefficients des UE, dans l'ordre des colonnes, None s'ils valent tous 1
+    :return: (([float], [str], [int])) les moyennes (None si l'étudiant n'a aucune note), les mentions et les nombres d'UE sans note
+    
+    CU: toutes les colonnes contiennent nb_etudiants notes, les coefficients sont positifs
+    
+    Exemple:
+    
+    >>> colonnes = [array("d", [12.0, NAN, NAN]), array("d", [15.0, 9.0, NAN]), array("d", [17.0, 11.0, NAN])]
+    >>> noyau_resultats(colonnes, 3)
+    ([14.667, 6.667, None], ['B', 'Ajourné', 'Absent'], [0, 1, 3])
+    >>> noyau_resultats(colonnes, 3, [6, 3, 3])
+    ([14.0, 5.0, None], ['B', 'Ajourné', 'Absent'], [0, 1, 3])
+    """
+    nb_ues = len(colonnes)
+    diviseur = nb_ues if coefficients == None else sum(coefficients)
+    if nb_ues == 0:
+        return [None] * nb_etudiants, [MENTIONS[0]] * nb_etudiants, [0] * nb_etudiants
+    if importer_numpy() == None:
+        bilans = [bilan_notes(notes, diviseur, coefficients) for notes in zip(*colonnes)]
+        if len(bilans) == 0:
+            return [], [], []
+        return tuple(list(champ) for champ in zip(*bilans))
+    
+    # Les UE sont sommées une à une, dans l'ordre, comme dans resultat, pour obtenir exactement les mêmes flottants
+    somme = numpy.zeros(nb_etudiants)
+    absences = numpy.zeros(nb_etudiants, dtype=numpy.int32)
+    for rang, colonne in enumerate(colonnes):
+        notes = numpy.frombuffer(colonne, dtype=numpy.float64)
+        absente = numpy.isnan(notes)
+        absences += absente
+        if coefficients != None:
+            notes = notes * coefficients[rang]
+        numpy.add(somme, notes, out=somme, where=~absente)
+    absent = absences == nb_ues
+    moyennes = somme / diviseur
+    arrondies = numpy.round(moyennes, 3)
+    # numpy.round multiplie par 1000 avant d'arrondir : près d'une demi-unité du 3e chiffre,
+    # il peut arrondir autrement que round. Ces cas rares sont recalculés avec round.
+    ecarts = numpy.abs(numpy.modf(moyennes * 1000)[0])
+    for i in numpy.flatnonzero(numpy.abs(ecarts - 0.5) < 1e-6).tolist():
+        arrondies[i] = round(float(moyennes[i]), 3)
+    indices_mentions = numpy.searchsorted(SEUILS_MENTIONS, arrondies, side="right") + 1
+    indices_mentions[absent] = 0
+    liste_moyennes = arrondies.tolist()
+    for i in numpy.flatnonzero(absent).tolist():
+        liste_moyennes[i] = None
+    mentions = numpy.array(MENTIONS, dtype=object)[indices_mentions].tolist()
+    return liste_moyennes, mentions, absences.tolist()
+
+def coefficients_ues(ues):
+    """
+    Renvoie les coefficients des UE données, pris dans COEFFICIENTS (1 pour une UE qui n'y est pas),
+    ou None s'ils valent tous 1 : les moyennes sont alors calculées sans aucune multiplication.
+    
+    :param ues: (iterable) les noms des UE
+    :return: ([float]) les coefficients, dans l'ordre des UE, ou None
+    
+    CU: any
+    
+    Exemple:
+    
+    >>> coefficients_ues(["maths", "info"]) == None
+    True
+    """
+    coefficients = [COEFFICIENTS.get(UE, 1) for UE in ues]
+    if all(coefficient == 1 for coefficient in coefficients):
+        return None
+    return coefficients
+
+def moyenne_et_mention(notes, nb_ues, coefficients=None):
+    """
+    Renvoie le couple (moyenne, mention) correspondant aux notes d'un étudiant, données dans une colonne de la matrice des notes.
+    
+    :param notes: (iterable) les notes de l'étudiant, NaN pour une note absente
+    :param nb_ues: (int) le nombre d'UE
+    :param coefficients: ([float]) les coefficients des UE, dans l'ordre des notes, None s'ils valent tous 1
+    :return: ((float, str)) le couple (moyenne, mention)
+    
+    CU: nb_ues > 0
+    
+    Exemples:
+    
+    >>> moyenne_et_mention((NAN, NAN), 2)
+    (None, 'Absent')
+    >>> moyenne_et_mention((12.0, NAN), 2)
+    (6.0, 'Ajourné')
+    >>> moyenne_et_mention((15.0, 16.0), 2)
+    (15.5, 'B')
+    >>> moyenne_et_mention((15.0, 16.0), 2, [1, 3])
+    (15.75, 'B')
+    """
+    return bilan_notes(notes, nb_ues if coefficients == None else sum(coefficients), coefficients)[:2]
+
+def bilan_notes(notes, diviseur, coefficients=None):
+    """
+    Renvoie la moyenne, la mention et le nombre d'UE sans note d'un étudiant, pour noyau_resultats sans numpy.
+    
+    :param notes: (iterable) les notes de l'étudiant, NaN pour une note absente
+    :param diviseur: (float) le nombre d'UE, ou la somme des coefficients s'ils sont donnés
+    :param coefficients: ([float]) les coefficients des UE, dans l'ordre des notes, None s'ils valent tous 1
+    :return: ((float, str, int)) la moyenne, la mention et le nombre d'UE sans note
+    
+    CU: diviseur > 0
+    """
+    somme = 0
+    absences = 0
+    nb_notes = 0
+    if coefficients == None:
+        for note in notes:
+            nb_notes += 1
+            if note == note: # Pas NaN
+                somme += note
+            else:
+                absences += 1
+    else:
+        for note, coefficient in zip(notes, coefficients):
+            nb_notes += 1
+            if note == note:
+                somme += coefficient * note
+            else:
+                absences += 1
+    if absences == nb_notes:
+        return (None, MENTIONS[0], absences)
+    moy = round(somme / diviseur, 3)
+    return moy, MENTIONS[bisect.bisect_right(SEUILS_MENTIONS, moy) + 1], absences
+
+class CacheResultats:
+    """
+    Cache des couples (moyenne, mention) des étudiants d'une Promo, par NIP, d'au plus taille_max étudiants.
+    Quand il est plein, les résultats utilisés le moins récemment sont oubliés (LRU).
+    
+    Le cache s'abonne à la promo (voir Promo) : une note modifiée par un report (reporter_notes, joindre_notes...)
+    oublie le résultat de cet étudiant seulement, et un changement des étudiants, des UE ou de leurs COEFFICIENTS vide le cache.
+    Les exports suivants ne recalculent donc que les résultats des étudiants dont une note a changé.
+    Il est installé par activer_cache_resultats, et utilisé par resultats, donc par ecrire_notes.
+    
+    Exemple:
+    
+    >>> promo = lire_promo("data/petite_liste_etudiants.csv")
+    >>> cache = activer_cache_resultats(promo)
+    >>> reporter_notes4(UES[1], promo, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> resultats(promo)[:2], (cache.succes, cache.echecs)
+    ([(4.5, 'Ajourné'), (None, 'Absent')], (0, 17))
+    >>> reporter_notes4(UES[0], promo, [('99990179', 7.5), ('11500571', 10.2)])
+    >>> resultats(promo)[:2], (cache.succes, cache.echecs)
+    ([(8.25, 'Ajourné'), (5.1, 'Ajourné')], (15, 19))
+    >>> resultats(promo) == [resultat(etudiant[5]) for etudiant in promo], (cache.succes, cache.echecs)
+    (True, (32, 19))
+    >>> COEFFICIENTS["maths"] = 6
+    >>> resultats(promo)[0], (cache.succes, cache.echecs)
+    ((7.714, 'Ajourné'), (32, 36))
+    >>> COEFFICIENTS["maths"] = 1
+    """
+
+    def __init__(self, promo, taille_max=TAILLE_CACHE_RESULTATS):
+        """
+        :param promo: (Promo) la promo, à laquelle le cache s'abonne
+        :param taille_max: (int) le nombre maximal de résultats gardés
+        """
+        self.promo = promo
+        self.taille_max = taille_max
+        self.resultats_nip = OrderedDict() # Du moins récemment utilisé au plus récent
+        self.coefficients = coefficients_ues(promo.notes) # Ceux des résultats gardés
+        self.succes = 0
+        self.echecs = 0
+        promo.abonnes.insert(0, self) # Vidé avant que les autres abonnés ne relisent les résultats
+
+    def note_modifiee(self, promo, indice, UE, ancienne, nouvelle):
+        """
+        Oublie le résultat d'un étudiant dont une note a changé : appelée par la promo.
+        """
+        if ancienne != nouvelle and (ancienne == ancienne or nouvelle == nouvelle): # Pas deux NaN
+            self.resultats_nip.pop(promo.nips[indice], None)
+
+    def promo_modifiee(self, promo):
+        """
+        Oublie tous les résultats : appelée par la promo quand ses étudiants ou ses UE changent.
+        """
+        self.resultats_nip.clear()
+        self.coefficients = coefficients_ues(promo.notes)
+
+    def resultats(self, debut=0, fin=None):
+        """
+        Renvoie les couples (moyenne, mention) des étudiants de la promo entre les positions debut (comprise) et fin (exclue).
+        Seuls les résultats absents du cache sont calculés, d'un coup, par resultats_colonnes.
+        Si les COEFFICIENTS des UE ont changé depuis le calcul des résultats gardés, le cache est d'abord vidé.
+        
+        :param debut: (int) la première position
+        :param fin: (int) la position qui suit la dernière, la fin de la promo par défaut
+        :return: ([(float, str)]) les couples (moyenne, mention)
+        
+        CU: 0 <= debut <= fin <= len(promo)
+        """
+        if fin == None:
+            fin = len(self.promo)
+        coefficients = coefficients_ues(self.promo.notes)
+        if coefficients != self.coefficients:
+            self.promo_modifiee(self.promo)
+        nips = self.promo.nips
+        resultats_nip = self.resultats_nip
+        liste_resultats = list(map(resultats_nip.get, nips[debut:fin]))
+        manquants = []
+        if None in liste_resultats:
+            manquants = [debut + i for i, resultat_etudiant in enumerate(liste_resultats) if resultat_etudiant == None]
+        if len(self.promo) > self.taille_max:
+            # Sinon le cache ne peut pas déborder : l'ordre d'utilisation ne sert pas
+            for i in range(debut, fin):
+                if liste_resultats[i - debut] != None:
+                    resultats_nip.move_to_end(nips[i])
+        if manquants:
+            colonnes = self.promo.notes.values()
+            if len(manquants) == fin - debut:
+                calcules = resultats_colonnes([colonne[debut:fin] for colonne in colonnes], fin - debut, coefficients)
+            else:
+                calcules = resultats_colonnes([array("d", [colonne[i] for i in manquants]) for colonne in colonnes], len(manquants), coefficients)
+            for i, resultat_etudiant in zip(manquants, calcules):
+                liste_resultats[i - debut] = resultat_etudiant
+                resultats_nip[nips[i]] = resultat_etudiant
+            while len(resultats_nip) > self.taille_max:
+                resultats_nip.popitem(last=False)
+        self.echecs += len(manquants)
+        self.succes += fin - debut - len(manquants)
+        return liste_resultats
+
+def activer_cache_resultats(promo, taille_max=TAILLE_CACHE_RESULTATS):
+    """
+    Installe un CacheResultats sur une promo, utilisé ensuite par resultats et ecrire_notes.
+    
+    :param promo: (Promo) la promo
+    :param taille_max: (int) le nombre maximal de résultats gardés
+    :return: (CacheResultats) le cache installé, ou celui que la promo avait déjà
+    
+    CU: les NIP de la promo sont tous différents
+    """
+    if promo.cache_resultats == None:
+        promo.cache_resultats = CacheResultats(promo, taille_max)
+    return promo.cache_resultats
+
+def compare_etudiant_admin(etudiant1, etudiant2):
+    """
+    Compare deux étudiants sur les critères administratifs
+    
+    Critères
+    ========
+    
+    :premier critère: les étudiants doivent être regroupés par profils. Les profils apparaissent dans l’ordre lexicographique (avec notre exemple doivent figurer en premier les LICAM, puis les MASS, puis les PEIP et enfin les SESI).
+    :deuxième critère: au sein d’un profil, les étudiants doivent être classés par ordre lexicographique des noms.
+    :troisième critère: en cas d’homonymie (mêmes noms) c’est l’ordre lexicographique des prénoms qui compte.
+    :quatrième critère: en cas d’homonymie complète (mêmes noms et prénoms [3]) c’est l’ordre lexicographique des NIP qui compte.
+
+    Paramètres
+    ==========
     :param etudiant1: (tuple) Une fiche d'étudiant
     :param etudiant2: (tuple) Une autre fiche d'étudiant
     :return: (int) -1 si etudiant1 est inférieur à étudiant2, 1 sinon. Dans des cas d'ubiquité: 0
     
     Exemple:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
     >>> compare_etudiant_admin(liste_etudiants[0], liste_etudiants[1])
     -1
+    >>> compare_etudiant_admin(('1', 'CALBUTH', 'RAYMOND', 'SESI', '1', {}), ('2', 'CALBUTH', 'MONIQUE', 'SESI', '1', {}))
+    1
     """
     if etudiant1[3] < etudiant2[3]: # Profil
         return -1
@@ -318,21 +1599,39 @@ def compare_etudiant_admin(etudiant1, etudiant2):
     if etudiant1[1] > etudiant2[1]:
         return 1
     
-    if etudiant1[1] < etudiant2[1]: # Prénom
+    if etudiant1[2] < etudiant2[2]: # Prénom
         return -1
-    if etudiant1[1] > etudiant2[1]:
+    if etudiant1[2] > etudiant2[2]:
         return 1
     
-    if etudiant1[0] < etudiant2[0]: # Prénom
+    if etudiant1[0] < etudiant2[0]: # NIP
         return -1
     if etudiant1[0] > etudiant2[0]:
         return 1
     
     return 0 # Identité parfaite. Cette personne est douée du don d'ubiquité
 
+def cle_etudiant_admin(etudiant):
+    """
+    Renvoie la clé de tri d'un étudiant selon les critères administratifs de compare_etudiant_admin.
+    Deux étudiants sont dans le même ordre que leurs clés, la clé n'est donc calculée qu'une fois par étudiant.
+    
+    :param etudiant: (tuple) une fiche d'étudiant
+    :return: ((str, str, str, str)) le quadruplet (PROFIL, NOM, PRENOM, NIP)
+    
+    CU: any
+    
+    Exemple:
+    
+    >>> cle_etudiant_admin(('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}))
+    ('LICAM', 'CALBUTH', 'RAYMOND', '90000001')
+    """
+    return (etudiant[3], etudiant[1], etudiant[2], etudiant[0])
+
 def trie_liste_etudiants(liste_etudiants):
     """
-    Trie une liste d'étudiants en fonctions des critères administratifs de compare_etudiant_admin tout en utilisant l'algorithme du Bubble Sort
+    Trie une liste d'étudiants en fonctions des critères administratifs de compare_etudiant_admin.
+    Utilise le tri de Python (Timsort, en O(n log n)) sur les clés de cle_etudiant_admin.
     
     :param liste_etudiants: (list) une liste de fiches d'étudiants
     :return: None
@@ -341,11 +1640,31 @@ def trie_liste_etudiants(liste_etudiants):
     
     Exemples:
     
-    >>> liste_etudiants = lire_liste_etudiants("data\\petite_liste_etudiants.csv")
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
     >>> trie_liste_etudiants(liste_etudiants)
     >>> print(liste_etudiants)
         [('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None}), ('11400130', 'SOUAISSA', 'AMZA', 'MASS', '2', {'maths': None, 'info': None}), ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': None, 'info': None}), ('90000003', 'CALBUTH', 'MONIQUE', 'PEIP', '12', {'maths': None, 'info': None}), ('11503188', 'DELOBELLE TOUSSAINT', 'MATTHIEU', 'PEIP', '15', {'maths': None, 'info': None}), ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': None, 'info': None}), ('90000004', 'CALBUTH', 'RAYMOND', 'SESI', '15', {'maths': None, 'info': None}), ('11504200', 'GUILLON ', 'DAVID', 'SESI', '22', {'maths': None, 'info': None}), ('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': None, 'info': None}), ('11503156', 'NAGET', 'ARTHUR', 'SESI', '42', {'maths': None, 'info': None}), ('11505350', 'NGUESSAN', 'MODJUE NOEMIE', 'SESI', '13', {'maths': None, 'info': None}), ('99990125', 'PERON', 'BENJAMIN', 'SESI', '41', {'maths': None, 'info': None}), ('11403526', 'SBAI', 'WISSEM', 'SESI', '14', {'maths': None, 'info': None}), ('11402978', 'SOETE', 'CEDRIC', 'SESI', '34', {'maths': None, 'info': None}), ('11500571', 'SPROCQ ', 'SIMON', 'SESI', '11', {'maths': None, 'info': None}), ('11501693', 'VANOVERBERGHE ', 'CORENTIN', 'SESI', '22', {'maths': None, 'info': None}), ('11502148', 'WATRELOS ', 'JEREMY', 'SESI', '34', {'maths': None, 'info': None})]
 
+    """
+    liste_etudiants.sort(key=cle_etudiant_admin)
+
+def trie_bulles_etudiants(liste_etudiants):
+    """
+    Trie une liste d'étudiants en fonctions des critères administratifs de compare_etudiant_admin tout en utilisant l'algorithme du Bubble Sort
+    Ancienne version de trie_liste_etudiants, en O(n²), conservée comme référence pour les mesures de performances.
+    
+    :param liste_etudiants: (list) une liste de fiches d'étudiants
+    :return: None
+    
+    CU: any
+    
+    Exemple:
+    
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> liste_triee = sorted(liste_etudiants, key=cle_etudiant_admin)
+    >>> trie_bulles_etudiants(liste_etudiants)
+    >>> liste_etudiants == liste_triee
+    True
     """
     swaped = True
     while swaped:
@@ -354,30 +1673,813 @@ def trie_liste_etudiants(liste_etudiants):
             if compare_etudiant_admin(liste_etudiants[i], liste_etudiants[i+1]) == 1:
                 liste_etudiants[i], liste_etudiants[i+1] = liste_etudiants[i+1], liste_etudiants[i]
                 swaped = True
+
+def premiers_etudiants(liste_etudiants, k):
+    """
+    Renvoie les k premiers étudiants selon les critères administratifs, sans trier toute la liste.
+    Utilise un tas, en O(n log k).
+    
+    :param liste_etudiants: (list) une liste de fiches d'étudiants
+    :param k: (int) le nombre d'étudiants voulus
+    :return: (list) les k premières fiches, triées
+    
+    CU: k >= 0
+    
+    Exemple:
+    
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> [etudiant[0] for etudiant in premiers_etudiants(liste_etudiants, 3)]
+    ['90000001', '11400130', '11503442']
+    """
+    return heapq.nsmallest(k, liste_etudiants, key=cle_etudiant_admin)
+
+def inserer_etudiants(liste_etudiants_triee, nouveaux_etudiants):
+    """
+    Ajoute de nouveaux étudiants à une liste déjà triée en conservant l'ordre administratif.
+    Seuls les nouveaux étudiants sont triés, puis les deux listes sont fusionnées en O(n + m).
+    La fusion est stable : à clé égale, les étudiants déjà présents restent en premier.
+    
+    :param liste_etudiants_triee: (list) une liste de fiches d'étudiants triée par trie_liste_etudiants
+    :param nouveaux_etudiants: (list) les fiches à ajouter, dans un ordre quelconque
+    :return: None
+    
+    CU: liste_etudiants_triee est triée selon les critères administratifs
+    
+    Exemple:
+    
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> liste_triee = liste_etudiants[:10]
+    >>> trie_liste_etudiants(liste_triee)
+    >>> inserer_etudiants(liste_triee, liste_etudiants[10:])
+    >>> trie_liste_etudiants(liste_etudiants)
+    >>> liste_triee == liste_etudiants
+    True
+    """
+    nouveaux_tries = sorted(nouveaux_etudiants, key=cle_etudiant_admin)
+    liste_etudiants_triee[:] = heapq.merge(liste_etudiants_triee, nouveaux_tries, key=cle_etudiant_admin)
                 
-def ecrire_notes(liste_etudiants_triee):
+class ArbreFenwick:
+    """
+    Arbre de Fenwick (arbre binaire indexé) qui compte des valeurs entières de 0 à taille - 1.
+    Ajouter ou retirer une valeur, compter les valeurs inférieures ou égales à une valeur et trouver
+    la k-ième plus petite valeur se font en O(log taille).
+    
+    Exemple:
+    
+    >>> arbre = ArbreFenwick(10, [3, 7, 7, 1])
+    >>> arbre.compter(6), arbre.compter(7), len(arbre)
+    (2, 4, 4)
+    >>> arbre.ajouter(7, -1)
+    >>> arbre.compter(7), arbre.kieme(3)
+    (3, 7)
+    """
+
+    def __init__(self, taille, valeurs=()):
+        """
+        :param taille: (int) le nombre de valeurs possibles
+        :param valeurs: (iterable) les valeurs de départ, comptées en O(taille + nombre de valeurs)
+        """
+        arbre = array("l", [0]) * (taille + 1) # arbre[i] compte les valeurs de i - (i & -i) à i - 1
+        nombre = 0
+        for valeur in valeurs:
+            if not 0 <= valeur < taille:
+                raise ValueError("Valeur hors de [0, {0}[ : {1}".format(taille, valeur))
+            arbre[valeur + 1] += 1
+            nombre += 1
+        for i in range(1, taille + 1):
+            parent = i + (i & -i)
+            if parent <= taille:
+                arbre[parent] += arbre[i]
+        self.arbre = arbre
+        self.taille = taille
+        self.nombre = nombre
+
+    def __len__(self):
+        return self.nombre
+
+    def ajouter(self, valeur, nombre=1):
+        """
+        Ajoute nombre fois la valeur (la retire si nombre est négatif).
+        
+        CU: lève ValueError si la valeur n'est pas entre 0 et taille - 1
+        """
+        if not 0 <= valeur < self.taille:
+            raise ValueError("Valeur hors de [0, {0}[ : {1}".format(self.taille, valeur))
+        self.nombre += nombre
+        i = valeur + 1
+        while i <= self.taille:
+            self.arbre[i] += nombre
+            i += i & -i
+
+    def compter(self, valeur):
+        """
+        Renvoie le nombre de valeurs inférieures ou égales à valeur.
+        """
+        total = 0
+        i = min(valeur + 1, self.taille)
+        while i > 0:
+            total += self.arbre[i]
+            i -= i & -i
+        return total
+
+    def kieme(self, k):
+        """
+        Renvoie la k-ième plus petite valeur (k commence à 1).
+        
+        CU: 1 <= k <= len(self)
+        """
+        position = 0
+        pas = 1 << self.taille.bit_length()
+        while pas:
+            if position + pas <= self.taille and self.arbre[position + pas] < k:
+                position += pas
+                k -= self.arbre[position]
+            pas >>= 1
+        return position
+
+class Statistiques:
+    """
+    Classements et statistiques des résultats d'une Promo, pour toute la promo, par profil et par groupe.
+    
+    Les moyennes (arrondies au millième comme dans resultat) de chaque profil et de chaque groupe sont comptées
+    dans un ArbreFenwick : le rang et le centile d'un étudiant ou un quantile des moyennes s'obtiennent en O(log n),
+    sans trier la promo. Les histogrammes des mentions et les moyennes des UE sont aussi tenus par profil et par groupe.
+    
+    Les statistiques s'abonnent à la promo (voir Promo) : chaque note reportée dans la promo met à jour
+    le résultat de l'étudiant et les statistiques de sa promo, de son profil et de son groupe.
+    Celles d'un profil ou d'un groupe ne sont calculées qu'à leur première demande.
+    Si les COEFFICIENTS des UE changent, tous les résultats sont recalculés à la demande suivante.
+    
+    Exemple:
+    
+    >>> promo = lire_promo("data/petite_liste_etudiants.csv")
+    >>> statistiques = Statistiques(promo)
+    >>> statistiques.histogramme_mentions()
+    {'Absent': 17, 'Ajourné': 0, 'Passable': 0, 'AB': 0, 'B': 0, 'TB': 0}
+    >>> reporter_notes4(UES[1], promo, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> reporter_notes4(UES[0], promo, lire_liste_notes("data/petite_notes_maths.csv"))
+    >>> statistiques.rang('11402978'), statistiques.rang('11402978', "profil"), statistiques.rang('11402978', "groupe")
+    (3, 3, 1)
+    >>> statistiques.centile('11402978', "profil")
+    83.3
+    >>> statistiques.quantile(0.5), statistiques.quantile(0.5, profil="PEIP")
+    (9.2, 9.2)
+    >>> statistiques.histogramme_mentions(profil="SESI")
+    {'Absent': 0, 'Ajourné': 6, 'Passable': 2, 'AB': 3, 'B': 0, 'TB': 1}
+    >>> statistiques.moyennes_ues(groupe="34")
+    {'maths': 12.45, 'info': 11.1}
+    >>> promo[4][5]["info"] = 20.0
+    >>> statistiques.rang('11402978', "groupe"), statistiques.moyennes_ues(groupe="34")
+    (2, {'maths': 12.45, 'info': 15.2})
+    >>> promo[4][5]["maths"] = -40.0
+    Traceback (most recent call last):
+    ...
+    ValueError: Note hors de [0, 20] : -40.0
+    >>> promo[4][5]["maths"], statistiques.rang('11402978', "groupe")
+    (10.7, 2)
+    >>> cache = activer_cache_resultats(promo)
+    >>> resultats(promo)[4]
+    (15.35, 'B')
+    >>> promo.ajouter_ue("anglais")
+    >>> statistiques.histogramme_mentions() == Statistiques(promo).histogramme_mentions(), statistiques.quantile(0.5)
+    (True, 6.133)
+    >>> COEFFICIENTS["anglais"] = 0
+    >>> statistiques.quantile(0.5), statistiques.rang('11402978') == Statistiques(promo).rang('11402978')
+    (9.2, True)
+    >>> del COEFFICIENTS["anglais"]
+    """
+
+    def __init__(self, promo):
+        """
+        :param promo: (Promo) la promo, à laquelle les statistiques s'abonnent
+        """
+        self.promo = promo
+        promo.abonnes.append(self)
+        self.promo_modifiee(promo)
+
+    def promo_modifiee(self, promo):
+        """
+        Recalcule tous les résultats : appelée par la promo quand ses étudiants ou ses UE changent.
+        """
+        self.coefficients = coefficients_ues(promo.notes) # Ceux des résultats calculés
+        self.etudiants = {} # NIP: [clés de la promo, du profil et du groupe, moyenne en millièmes ou None, indice de la mention]
+        liste_resultats = resultats_colonnes(colonnes_notes(promo), len(promo), self.coefficients)
+        for NIP, profil, groupe, (moy, mention) in zip(promo.nips, promo.profils, promo.groupes, liste_resultats):
+            self.etudiants[NIP] = [(None, ("profil", LISTE_PROFILS[profil]), ("groupe", groupe)),
+                                   millimes(moy), MENTIONS.index(mention)]
+        self.agregats = {} # Statistiques de chaque clé déjà demandée
+
+    def verifier_coefficients(self):
+        """
+        Recalcule tous les résultats si les COEFFICIENTS des UE ont changé depuis leur calcul.
+        
+        :return: (bool) True si les résultats ont été recalculés
+        """
+        if coefficients_ues(self.promo.notes) == self.coefficients:
+            return False
+        self.promo_modifiee(self.promo)
+        return True
+
+    def note_modifiee(self, promo, indice, UE, ancienne, nouvelle):
+        """
+        Met à jour le résultat d'un étudiant et les statistiques de ses clés : appelée par la promo à chaque note modifiée.
+        """
+        if nouvelle == nouvelle and not 0 <= nouvelle <= NOTE_MAX:
+            raise ValueError("Note hors de [0, {0}] : {1}".format(NOTE_MAX, nouvelle))
+        if self.verifier_coefficients(): # La nouvelle note, déjà dans la promo, a été comptée
+            return
+        etudiant = self.etudiants.get(promo.nips[indice])
+        if etudiant == None: # Étudiant en cours d'ajout : promo_modifiee suivra
+            return
+        agregats = [self.agregats[cle] for cle in etudiant[0] if cle in self.agregats]
+        for agregat in agregats:
+            somme_nombre = agregat["sommes"].setdefault(UE, [0.0, 0])
+            if ancienne == ancienne:
+                somme_nombre[0] -= ancienne
+                somme_nombre[1] -= 1
+            if nouvelle == nouvelle:
+                somme_nombre[0] += nouvelle
+                somme_nombre[1] += 1
+        moy, mention = moyenne_et_mention([colonne[indice] for colonne in promo.notes.values()], len(promo.notes),
+                                          self.coefficients)
+        valeur, indice_mention = millimes(moy), MENTIONS.index(mention)
+        if (valeur, indice_mention) == (etudiant[1], etudiant[2]):
+            return
+        for agregat in agregats:
+            retirer_resultat(agregat, etudiant[1], etudiant[2], -1)
+            retirer_resultat(agregat, valeur, indice_mention, 1)
+        etudiant[1], etudiant[2] = valeur, indice_mention
+
+    def agregat(self, cle):
+        """
+        Renvoie les statistiques d'une clé, calculées en parcourant la promo à la première demande.
+        
+        :param cle: (tuple) None pour toute la promo, ("profil", PROFIL) ou ("groupe", GROUPE)
+        :return: (dict) {"arbre": ArbreFenwick des moyennes en millièmes, "mentions": [nombre par mention],
+                         "sommes": {UE: [somme des notes, nombre de notes]}}
+        """
+        self.verifier_coefficients()
+        if cle in self.agregats:
+            return self.agregats[cle]
+        promo = self.promo
+        membres = [i for i, NIP in enumerate(promo.nips) if cle in self.etudiants[NIP][0]]
+        mentions, valeurs = [0] * len(MENTIONS), []
+        for i in membres:
+            etudiant = self.etudiants[promo.nips[i]]
+            mentions[etudiant[2]] += 1
+            if etudiant[1] != None:
+                valeurs.append(etudiant[1])
+        agregat = {"arbre": ArbreFenwick(NOTE_MAX * 1000 + 1, valeurs), "mentions": mentions, "sommes": {}}
+        for UE, colonne in promo.notes.items():
+            notes = [colonne[i] for i in membres if colonne[i] == colonne[i]]
+            agregat["sommes"][UE] = [math.fsum(notes), len(notes)]
+        self.agregats[cle] = agregat
+        return agregat
+
+    def rang(self, NIP, par=None):
+        """
+        Renvoie le rang d'un étudiant, selon sa moyenne, dans la promo, son profil ou son groupe.
+        Les étudiants de même moyenne ont le même rang.
+        
+        :param NIP: (str) le NIP de l'étudiant
+        :param par: (str) None pour la promo, "profil" ou "groupe"
+        :return: (int) le rang (1 pour la meilleure moyenne), None si l'étudiant est absent
+        
+        CU: le NIP est dans la promo
+        """
+        self.verifier_coefficients()
+        etudiant = self.etudiants[NIP]
+        if etudiant[1] == None:
+            return None
+        arbre = self.agregat(etudiant[0][CLES_STATISTIQUES.index(par)])["arbre"]
+        return len(arbre) - arbre.compter(etudiant[1]) + 1
+
+    def centile(self, NIP, par=None):
+        """
+        Renvoie le pourcentage des étudiants de la promo, du profil ou du groupe qui ont une moyenne inférieure ou égale
+        à celle de l'étudiant, arrondi au dixième. Les étudiants absents ne sont pas comptés.
+        
+        :param NIP: (str) le NIP de l'étudiant
+        :param par: (str) None pour la promo, "profil" ou "groupe"
+        :return: (float) le centile, None si l'étudiant est absent
+        
+        CU: le NIP est dans la promo
+        """
+        self.verifier_coefficients()
+        etudiant = self.etudiants[NIP]
+        if etudiant[1] == None:
+            return None
+        arbre = self.agregat(etudiant[0][CLES_STATISTIQUES.index(par)])["arbre"]
+        return round(100 * arbre.compter(etudiant[1]) / len(arbre), 1)
+
+    def quantile(self, q, profil=None, groupe=None):
+        """
+        Renvoie la moyenne telle qu'une proportion q des étudiants ont une moyenne inférieure ou égale (méthode du rang le plus proche).
+        Les étudiants absents ne sont pas comptés.
+        
+        :param q: (float) la proportion, 0.5 pour la médiane
+        :param profil: (str) un profil, pour se limiter à ses étudiants
+        :param groupe: (str) un groupe, pour se limiter à ses étudiants
+        :return: (float) la moyenne, None si aucun étudiant n'a de moyenne
+        
+        CU: 0 <= q <= 1, profil et groupe ne sont pas donnés tous les deux
+        """
+        arbre = self.agregat(cle_statistiques(profil, groupe))["arbre"]
+        if len(arbre) == 0:
+            return None
+        return arbre.kieme(max(1, math.ceil(q * len(arbre)))) / 1000
+
+    def histogramme_mentions(self, profil=None, groupe=None):
+        """
+        Renvoie le nombre d'étudiants de chaque mention, dans la promo ou dans un profil ou un groupe.
+        
+        :param profil: (str) un profil, pour se limiter à ses étudiants
+        :param groupe: (str) un groupe, pour se limiter à ses étudiants
+        :return: (dict) {mention: nombre}, dans l'ordre de MENTIONS
+        
+        CU: profil et groupe ne sont pas donnés tous les deux
+        """
+        return dict(zip(MENTIONS, self.agregat(cle_statistiques(profil, groupe))["mentions"]))
+
+    def moyennes_ues(self, profil=None, groupe=None):
+        """
+        Renvoie la moyenne des notes de chaque UE, arrondie au millième, dans la promo ou dans un profil ou un groupe.
+        Les notes absentes ne sont pas comptées.
+        
+        :param profil: (str) un profil, pour se limiter à ses étudiants
+        :param groupe: (str) un groupe, pour se limiter à ses étudiants
+        :return: (dict) {UE: moyenne}, la moyenne valant None si l'UE n'a aucune note
+        
+        CU: profil et groupe ne sont pas donnés tous les deux
+        """
+        sommes = self.agregat(cle_statistiques(profil, groupe))["sommes"]
+        moyennes = {}
+        for UE in self.promo.notes:
+            somme, nombre = sommes.get(UE, (0.0, 0))
+            moyennes[UE] = round(somme / nombre, 3) if nombre > 0 else None
+        return moyennes
+
+def millimes(moyenne):
     """
-    Ecrit les notes dans un fichier "notes_etudiants.csv"
+    Renvoie une moyenne arrondie au millième en nombre entier de millièmes, None si la moyenne est None.
+    
+    :param moyenne: (float) la moyenne, comme renvoyée par resultat
+    :return: (int)
+    
+    CU: lève ValueError si la moyenne n'est pas entre 0 et NOTE_MAX (ou n'est pas finie)
     
-    :param liste_etudiants_triee: (list) une liste de fiches d'étudiants supposée triée (selon les critères administratifs)
+    Exemples:
+    
+    >>> millimes(12.345), millimes(None)
+    (12345, None)
+    >>> millimes(-4.0)
+    Traceback (most recent call last):
+    ...
+    ValueError: Moyenne hors de [0, 20] : -4.0
+    """
+    if moyenne == None:
+        return None
+    if not 0 <= moyenne <= NOTE_MAX:
+        raise ValueError("Moyenne hors de [0, {0}] : {1}".format(NOTE_MAX, moyenne))
+    return round(moyenne * 1000)
+
+def retirer_resultat(agregat, valeur, indice_mention, nombre):
+    """
+    Ajoute (nombre = 1) ou retire (nombre = -1) le résultat d'un étudiant des statistiques d'une clé.
+    
+    :param agregat: (dict) les statistiques de la clé, voir Statistiques.agregat
+    :param valeur: (int) la moyenne en millièmes, None si l'étudiant est absent
+    :param indice_mention: (int) l'indice de la mention dans MENTIONS
+    :param nombre: (int) 1 ou -1
     :return: None
     
     CU: any
     """
-    with open("notes_etudiants.csv", "w") as canal_notes:
-        for etudiant in liste_etudiants_triee:
-            notes = [etudiant[5][UE] for UE in etudiant[5]]
-            for i, note in enumerate(notes):
-                if note == None:
-                    notes[i] = ""
-                notes[i] = str(notes[i])
-            moyenne, mention = resultat(etudiant[5])
-            if moyenne == None:
-                moyenne = ""
-            moyenne = str(moyenne)
-            
-            ligne = "|".join(etudiant[:5] + tuple(notes) + (moyenne, mention))
-            canal_notes.write(ligne + "\n")
+    agregat["mentions"][indice_mention] += nombre
+    if valeur != None:
+        agregat["arbre"].ajouter(valeur, nombre)
+
+def cle_statistiques(profil=None, groupe=None):
+    """
+    Renvoie la clé des statistiques de la promo, d'un profil ou d'un groupe.
+    
+    :param profil: (str) un profil ou None
+    :param groupe: (str) un groupe ou None
+    :return: (tuple) None, ("profil", profil) ou ("groupe", groupe)
+    
+    CU: profil et groupe ne sont pas donnés tous les deux
+    """
+    if profil != None:
+        return ("profil", profil)
+    if groupe != None:
+        return ("groupe", groupe)
+    return None
+
+def lots_colonnes(liste_etudiants):
+    """
+    Générateur des lots d'au plus TAILLE_LOT étudiants, chaque lot étant donné par colonnes avec les résultats des étudiants.
+    Pour une Promo, les colonnes sont découpées directement, sinon les étudiants sont lus au fur et à mesure,
+    ce qui permet d'écrire un générateur d'étudiants sans le garder entièrement en mémoire.
+    
+    :param liste_etudiants: (iterable) des fiches d'étudiants ou une Promo
+    :return: (generator) les triplets (champs, notes, resultats) : champs est la liste des 5 colonnes (NIP, NOM, PRENOM, PROFIL, GROUPE),
+             notes le dictionnaire {UE: array('d')} des notes (NaN si absente) et resultats la liste des couples (moyenne, mention)
+    
+    CU: toutes les fiches ont les mêmes UE
+    
+    Exemple:
+    
+    >>> promo = lire_promo("data/petite_liste_etudiants.csv")
+    >>> champs, notes, resultats_lot = next(lots_colonnes(promo))
+    >>> champs[0][:2], list(notes), resultats_lot[0]
+    (['99990179', '11500571'], ['maths', 'info'], (None, 'Absent'))
+    """
+    if isinstance(liste_etudiants, Promo):
+        tous_resultats = resultats(liste_etudiants)
+        for debut in range(0, len(liste_etudiants), TAILLE_LOT):
+            fin = debut + TAILLE_LOT
+            champs = [liste_etudiants.nips[debut:fin], liste_etudiants.noms[debut:fin], liste_etudiants.prenoms[debut:fin],
+                      [LISTE_PROFILS[profil] for profil in liste_etudiants.profils[debut:fin]], liste_etudiants.groupes[debut:fin]]
+            notes = {UE: colonne[debut:fin] for UE, colonne in liste_etudiants.notes.items()}
+            yield champs, notes, tous_resultats[debut:fin]
+        return
+    etudiants = iter(liste_etudiants)
+    lot = list(itertools.islice(etudiants, TAILLE_LOT))
+    while lot:
+        champs = [list(colonne) for colonne in zip(*(etudiant[:5] for etudiant in lot))]
+        colonnes = colonnes_notes(lot)
+        yield champs, dict(zip(lot[0][5], colonnes)), resultats_colonnes(colonnes, len(lot), coefficients_ues(lot[0][5]))
+        lot = list(itertools.islice(etudiants, TAILLE_LOT))
+
+def ecrire_notes(liste_etudiants_triee, fichier="notes_etudiants.csv", format_sortie="csv"):
+    """
+    Ecrit les notes dans un fichier, par défaut "notes_etudiants.csv"
+    Les étudiants sont écrits par lots de TAILLE_LOT, en une seule écriture par lot.
+    
+    Formats
+    =======
+    
+    :csv: une ligne NIP|NOM|PRENOM|PROFIL|GROUPE|NOTE_UE1|...|MOYENNE|MENTION par étudiant, une note absente étant laissée vide.
+    :binaire: le format par colonnes décrit dans ecrire_notes_binaire, relu par parcourir_notes_binaire.
+    
+    Paramètres
+    ==========
+    :param liste_etudiants_triee: (iterable) une liste de fiches d'étudiants supposée triée (selon les critères administratifs), une Promo ou un générateur de fiches
+    :param fichier: (str) le fichier à écrire
+    :param format_sortie: (str) "csv" ou "binaire"
+    :return: None
+    
+    CU: format_sortie est dans FORMATS_SORTIE, sinon ValueError est levée
+    
+    Exemple:
+    
+    >>> import tempfile
+    >>> fichier = os.path.join(tempfile.mkdtemp(), "notes.csv")
+    >>> liste_etudiants = lire_liste_etudiants("data/petite_liste_etudiants.csv")
+    >>> reporter_notes4(UES[1], liste_etudiants, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> ecrire_notes(liste_etudiants, fichier)
+    >>> with open(fichier) as canal_notes:
+    ...     print(canal_notes.readline(), end="")
+    99990179|HOUTEKIET|THOMAS|SESI|53||9.0|4.5|Ajourné
+    """
+    if not format_sortie in FORMATS_SORTIE:
+        raise ValueError("Format de sortie inconnu : {0}".format(format_sortie))
+    with etape("ecriture_notes_" + format_sortie) as mesure:
+        if format_sortie == "csv":
+            ecrire_notes_csv(liste_etudiants_triee, fichier)
+        else:
+            ecrire_notes_binaire(liste_etudiants_triee, fichier)
+        if mesure.active:
+            mesure.compter(lignes=len(liste_etudiants_triee) if isinstance(liste_etudiants_triee, Sized) else 0,
+                           octets_ecrits=taille_fichier(fichier))
+
+def ecrire_notes_csv(liste_etudiants_triee, fichier):
+    """
+    Ecrit les notes au format csv (voir ecrire_notes). Chaque lot est converti en texte colonne par colonne.
+    
+    :param liste_etudiants_triee: (iterable) des fiches d'étudiants ou une Promo
+    :param fichier: (str) le fichier à écrire
+    :return: None
+    
+    CU: any
+    """
+    with open(fichier, "w", buffering=TAILLE_TAMPON) as canal_notes:
+        for champs, notes, resultats_lot in lots_colonnes(liste_etudiants_triee):
+            textes_notes = [["" if note != note else str(note) for note in colonne] for colonne in notes.values()]
+            moyennes = ["" if moyenne == None else str(moyenne) for moyenne, mention in resultats_lot]
+            mentions = [mention for moyenne, mention in resultats_lot]
+            lignes = map(SEPARATEUR.join, zip(*champs, *textes_notes, moyennes, mentions))
+            canal_notes.write("\n".join(lignes) + "\n")
+
+def octets_texte(valeurs):
+    """
+    Renvoie un bloc d'octets contenant des chaînes : leur longueur totale sur 8 octets puis les chaînes en utf-8 séparées par des retours à la ligne.
+    
+    :param valeurs: ([str]) les chaînes, sans retour à la ligne
+    :return: (bytes)
+    
+    CU: any
+    """
+    octets = "\n".join(valeurs).encode("utf-8")
+    return struct.pack("<Q", len(octets)) + octets
+
+def octets_array(valeurs):
+    """
+    Renvoie le contenu d'un array en petit-boutiste (little-endian), quel que soit le processeur.
+    
+    :param valeurs: (array) les valeurs
+    :return: (bytes)
+    
+    CU: any
+    """
+    if sys.byteorder == "big":
+        valeurs = array(valeurs.typecode, valeurs)
+        valeurs.byteswap()
+    return valeurs.tobytes()
+
+def ecrire_notes_binaire(liste_etudiants_triee, fichier):
+    """
+    Ecrit les notes dans un format binaire par colonnes, que les outils peuvent relire sans analyser de texte.
+    
+    Le fichier commence par MAGIE_BINAIRE, le nombre d'UE (4 octets) et le bloc de texte (voir octets_texte) des noms des UE.
+    Suivent des groupes d'au plus TAILLE_LOT étudiants : le nombre d'étudiants du groupe (4 octets), les 5 blocs de texte
+    des colonnes NIP, NOM, PRENOM, PROFIL, GROUPE, puis les colonnes de flottants (8 octets, NaN si absente) des notes de chaque UE
+    et des moyennes, et enfin la colonne des indices (1 octet) des mentions dans MENTIONS.
+    Tous les entiers et flottants sont en petit-boutiste.
+    
+    :param liste_etudiants_triee: (iterable) des fiches d'étudiants ou une Promo
+    :param fichier: (str) le fichier à écrire
+    :return: None
+    
+    CU: any
+    
+    Exemple:
+    
+    >>> import tempfile
+    >>> fichier = os.path.join(tempfile.mkdtemp(), "notes.bin")
+    >>> promo = lire_promo("data/petite_liste_etudiants.csv")
+    >>> reporter_notes4(UES[1], promo, lire_liste_notes("data/petite_notes_info.csv"))
+    >>> ecrire_notes(promo, fichier, "binaire")
+    >>> next(parcourir_notes_binaire(fichier))
+    ('99990179', 'HOUTEKIET', 'THOMAS', 'SESI', '53', {'maths': None, 'info': 9.0}, 4.5, 'Ajourné')
+    >>> [ligne[:6] for ligne in parcourir_notes_binaire(fichier)] == promo
+    True
+    """
+    indices_mentions = {mention: i for i, mention in enumerate(MENTIONS)}
+    with open(fichier, "wb", buffering=TAILLE_TAMPON) as canal_notes:
+        canal_notes.write(MAGIE_BINAIRE)
+        en_tete_ecrit = False
+        for champs, notes, resultats_lot in lots_colonnes(liste_etudiants_triee):
+            if not en_tete_ecrit:
+                canal_notes.write(struct.pack("<I", len(notes)) + octets_texte(list(notes)))
+                en_tete_ecrit = True
+            groupe = [struct.pack("<I", len(resultats_lot))]
+            groupe.extend(octets_texte(colonne) for colonne in champs)
+            groupe.extend(octets_array(colonne) for colonne in notes.values())
+            groupe.append(octets_array(array("d", [NAN if moyenne == None else moyenne for moyenne, mention in resultats_lot])))
+            groupe.append(octets_array(array("B", [indices_mentions[mention] for moyenne, mention in resultats_lot])))
+            canal_notes.write(b"".join(groupe))
+        if not en_tete_ecrit:
+            canal_notes.write(struct.pack("<I", 0) + octets_texte([]))
+
+def parcourir_notes_binaire(fichier):
+    """
+    Générateur des lignes d'un fichier écrit par ecrire_notes_binaire.
+    
+    :param fichier: (str) le nom du fichier
+    :return: (generator) les octuplets (NIP, NOM, PRENOM, PROFIL, GROUPE, NOTES, MOYENNE, MENTION), NOTES étant un dictionnaire
+    
+    CU: Lève ValueError si le fichier n'est pas au bon format
+    """
+    with open(fichier, "rb", buffering=TAILLE_TAMPON) as canal_notes:
+        if canal_notes.read(len(MAGIE_BINAIRE)) != MAGIE_BINAIRE:
+            raise ValueError("{0} n'est pas un fichier de notes binaire".format(fichier))
+        nb_ues = struct.unpack("<I", canal_notes.read(4))[0]
+        ues = lire_texte_binaire(canal_notes, nb_ues)
+        en_tete_groupe = canal_notes.read(4)
+        while en_tete_groupe:
+            nb_etudiants = struct.unpack("<I", en_tete_groupe)[0]
+            champs = [lire_texte_binaire(canal_notes, nb_etudiants) for i in range(5)]
+            notes = [lire_array_binaire(canal_notes, "d", nb_etudiants) for UE in ues]
+            moyennes = lire_array_binaire(canal_notes, "d", nb_etudiants)
+            mentions = lire_array_binaire(canal_notes, "B", nb_etudiants)
+            for i in range(nb_etudiants):
+                notes_etudiant = {UE: None if colonne[i] != colonne[i] else colonne[i] for UE, colonne in zip(ues, notes)}
+                moyenne = None if moyennes[i] != moyennes[i] else moyennes[i]
+                yield tuple(champ[i] for champ in champs) + (notes_etudiant, moyenne, MENTIONS[mentions[i]])
+            en_tete_groupe = canal_notes.read(4)
+
+def lire_texte_binaire(canal, nombre):
+    """
+    Lit un bloc écrit par octets_texte et renvoie ses chaînes.
+    
+    :param canal: (file) le fichier ouvert en lecture binaire
+    :param nombre: (int) le nombre de chaînes du bloc
+    :return: ([str])
+    
+    CU: any
+    """
+    longueur = struct.unpack("<Q", canal.read(8))[0]
+    if nombre == 0:
+        canal.read(longueur)
+        return []
+    return canal.read(longueur).decode("utf-8").split("\n")
+
+def lire_array_binaire(canal, typecode, nombre):
+    """
+    Lit une colonne écrite par octets_array.
+    
+    :param canal: (file) le fichier ouvert en lecture binaire
+    :param typecode: (str) le type des valeurs ("d" ou "B")
+    :param nombre: (int) le nombre de valeurs
+    :return: (array)
+    
+    CU: any
+    """
+    valeurs = array(typecode)
+    valeurs.frombytes(canal.read(nombre * valeurs.itemsize))
+    if sys.byteorder == "big":
+        valeurs.byteswap()
+    return valeurs
+
+def empreinte_fichier(fichier):
+    """
+    Renvoie l'empreinte (hachage du contenu) d'un fichier, lu par blocs de TAILLE_TAMPON octets.
+    
+    :param fichier: (str) le nom ou chemin du fichier
+    :return: (str) l'empreinte en hexadécimal
+    
+    CU: le fichier existe
+    
+    Exemple:
+    
+    >>> empreinte_fichier("data/petite_notes_info.csv") == empreinte_fichier("data/petite_notes_info_wrong.csv")
+    False
+    """
+    hachage = hashlib.blake2b()
+    with open(fichier, "rb") as canal_fichier:
+        bloc = canal_fichier.read(TAILLE_TAMPON)
+        while bloc:
+            hachage.update(bloc)
+            bloc = canal_fichier.read(TAILLE_TAMPON)
+    return hachage.hexdigest()
+
+def fichier_modifie(fichier, signatures):
+    """
+    Indique si un fichier a changé depuis que sa signature a été enregistrée dans signatures, et met à jour celle-ci.
+    La date de modification et la taille sont comparées d'abord : le contenu n'est haché que si elles ont changé.
+    
+    :param fichier: (str) le nom ou chemin du fichier
+    :param signatures: (dict) les signatures {fichier: (date de modification, taille, empreinte)} déjà connues
+    :return: (bool) True si le fichier est nouveau ou si son contenu a changé
+    
+    CU: le fichier existe
+    
+    Exemple:
+    
+    >>> signatures = {}
+    >>> fichier_modifie("data/petite_notes_info.csv", signatures)
+    True
+    >>> fichier_modifie("data/petite_notes_info.csv", signatures)
+    False
+    """
+    etat = os.stat(fichier)
+    ancienne = signatures.get(fichier)
+    if ancienne != None and ancienne[:2] == (etat.st_mtime_ns, etat.st_size):
+        return False
+    empreinte = empreinte_fichier(fichier)
+    signatures[fichier] = (etat.st_mtime_ns, etat.st_size, empreinte)
+    return ancienne == None or ancienne[2] != empreinte
+
+def lire_notes_paralleles(fichiers_notes, nb_processus):
+    """
+    Générateur des couples (UE, liste de notes) des fichiers donnés, lus en parallèle par nb_processus processus.
+    Les UE sont renvoyées dans l'ordre de fichiers_notes, chacune dès que son fichier est lu.
+    Chaque processus lit son fichier avec projeter_notes : seuls un bytearray et un array sont renvoyés au processus principal.
+    
+    :param fichiers_notes: (dict) les fichiers de notes {UE: fichier}
+    :param nb_processus: (int) le nombre de processus
+    :return: (generator)
+    
+    CU: nb_processus >= 1
+    
+    Exemple:
+    
+    >>> notes = dict(lire_notes_paralleles({"maths": "data/petite_notes_maths.csv", "info": "data/petite_notes_info.csv"}, 2))
+    >>> notes["info"] == lire_liste_notes("data/petite_notes_info.csv")
+    True
+    
+    Sur un fichier mal formé, le script s'arrête avec la même erreur qu'en lecture séquentielle :
+    
+    >>> import shutil, tempfile
+    >>> with tempfile.TemporaryDirectory() as dossier:
+    ...     _ = shutil.copy("data/petite_liste_etudiants.csv", os.path.join(dossier, "liste_etudiants.csv"))
+    ...     with open(os.path.join(dossier, "notes_maths.csv"), "w") as canal_notes:
+    ...         _ = canal_notes.write("11400130|12,5\\n11402978|8.0\\n\\n")
+    ...     options = ["--donnees", dossier, "--sortie", os.path.join(dossier, "sortie.csv"), "--cache", os.path.join(dossier, "cache")]
+    ...     main(options + ["maths"]), main(options + ["--jobs", "2", "maths"])
+    Note du mauvais format (devrait être un nombre à point flottant
+    Note du mauvais format (devrait être un nombre à point flottant
+    (1, 1)
+    """
+    from concurrent.futures import ProcessPoolExecutor # Import coûteux, inutile sans --jobs
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        yield from zip(fichiers_notes, executeur.map(projeter_notes, fichiers_notes.values()))
+
+def charger_promo_incrementale(fichier_etudiants, fichiers_notes, fichier_cache, nb_processus=1):
+    """
+    Renvoie la Promo triée des étudiants de fichier_etudiants, avec les notes de chaque UE reportées.
+    
+    La promo, l'index des NIP et les signatures des fichiers sources sont sauvegardés dans fichier_cache.
+    À l'appel suivant, seuls les fichiers de notes modifiés sont relus : la colonne de leur UE est vidée puis remplie à nouveau.
+    Si la liste des étudiants a changé, tout est reconstruit.
+    
+    :param fichier_etudiants: (str) le fichier des étudiants
+    :param fichiers_notes: (dict) les fichiers de notes {UE: fichier}
+    :param fichier_cache: (str) le fichier de sauvegarde
+    :param nb_processus: (int) le nombre de processus qui lisent les fichiers de notes, voir lire_notes_paralleles
+    :return: (Promo) la promo triée selon les critères administratifs
+    
+    CU: les fichiers existent. Le fichier de sauvegarde ne doit provenir que de cette fonction (il est lu avec pickle).
+        Les notes d'étudiants inconnus et les notes en double sont signalées (voir joindre_notes).
+    
+    Exemple:
+    
+    >>> import tempfile
+    >>> fichier_cache = os.path.join(tempfile.mkdtemp(), "cache.pickle")
+    >>> fichiers_notes = {"maths": "data/petite_notes_maths.csv", "info": "data/petite_notes_info.csv"}
+    >>> promo = charger_promo_incrementale("data/petite_liste_etudiants.csv", fichiers_notes, fichier_cache)
+    >>> promo[0]
+    ('90000001', 'CALBUTH', 'RAYMOND', 'LICAM', '1', {'maths': None, 'info': None})
+    >>> promo[5]
+    ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': 0.0, 'info': 0.0})
+    >>> fichiers_notes["info"] = "data/petite_notes_maths.csv"
+    >>> charger_promo_incrementale("data/petite_liste_etudiants.csv", fichiers_notes, fichier_cache)[5]
+    ('90000002', 'CALBUTH', 'RAYMOND', 'SESI', '16', {'maths': 0.0, 'info': 0.0})
+    >>> charger_promo_incrementale("data/petite_liste_etudiants.csv", fichiers_notes, fichier_cache)[2]
+    ('11503442', 'BEAU', 'CORENTIN', 'PEIP', '13', {'maths': 8.2, 'info': 8.2})
+    """
+    import pickle # Import coûteux, inutile si le module est importé sans lancer le script
+    cache = None
+    if os.path.isfile(fichier_cache):
+        with etape("lecture_cache") as mesure:
+            mesure.compter(octets_lus=taille_fichier(fichier_cache))
+            try:
+                with open(fichier_cache, "rb") as canal_cache:
+                    cache = pickle.load(canal_cache)
+            except (pickle.UnpicklingError, EOFError, AttributeError):
+                cache = None # Sauvegarde illisible : on reconstruit tout
+    if cache == None or cache["version"] != VERSION_CACHE:
+        cache = {"version": VERSION_CACHE, "signatures": {}, "sources": {}}
+    signatures = cache["signatures"]
+    
+    if fichier_modifie(fichier_etudiants, signatures) or cache["sources"].get(None) != fichier_etudiants:
+        with etape("lecture_etudiants") as mesure:
+            promo = Promo(parcourir_etudiants(fichier_etudiants, list(fichiers_notes)), list(fichiers_notes))
+            mesure.compter(lignes=len(promo), octets_lus=taille_fichier(fichier_etudiants))
+        with etape("tri_etudiants") as mesure:
+            trie_liste_etudiants(promo)
+            mesure.compter(lignes=len(promo))
+        cache["promo"] = promo
+        cache["index"] = index_nips(promo)
+        cache["sources"] = {None: fichier_etudiants}
+    promo = cache["promo"]
+    
+    # Un même fichier peut servir à plusieurs UE : on ne regarde qu'une fois s'il a changé
+    fichiers_modifies = {fichier for fichier in set(fichiers_notes.values()) if fichier_modifie(fichier, signatures)}
+    fichiers_a_relire = {}
+    for UE, fichier in fichiers_notes.items():
+        if fichier in fichiers_modifies or cache["sources"].get(UE) != fichier:
+            promo.ajouter_ue(UE) # Remplace l'ancienne colonne par une colonne vide
+            fichiers_a_relire[UE] = fichier
+            cache["sources"][UE] = fichier
+    if nb_processus > 1:
+        notes_lues = lire_notes_paralleles(fichiers_a_relire, nb_processus)
+    else:
+        notes_lues = ((UE, parcourir_notes(fichier)) for UE, fichier in fichiers_a_relire.items())
+    # Les notes sont reportées ici seulement, UE par UE, au fur et à mesure qu'elles sont lues
+    for UE, liste_notes in notes_lues:
+        with etape("report_notes_" + UE) as mesure:
+            rapport = joindre_notes(promo, {UE: liste_notes}, "dico", cache["index"])
+            if mesure.active: # Compter les notes reportées parcourt la colonne : seulement pendant le profilage
+                mesure.compter(lignes=sum(note == note for note in promo.notes[UE]) + len(rapport["orphelins"][UE]) + len(rapport["doublons"][UE]),
+                               octets_lus=taille_fichier(fichiers_a_relire[UE]))
+        if rapport["orphelins"][UE] or rapport["doublons"][UE]:
+            print("UE {0} : {1} note(s) d'étudiants inconnus ignorée(s), {2} note(s) en double".format(
+                UE, len(rapport["orphelins"][UE]), len(rapport["doublons"][UE])))
+    for UE in promo.ues:
+        if not UE in fichiers_notes:
+            del promo.notes[UE]
+            cache["sources"].pop(UE, None)
+    promo.notes = {UE: promo.notes[UE] for UE in fichiers_notes}
+    
+    with etape("ecriture_cache") as mesure:
+        fichier_temporaire = fichier_cache + ".tmp"
+        with open(fichier_temporaire, "wb") as canal_cache:
+            pickle.dump(cache, canal_cache, pickle.HIGHEST_PROTOCOL)
+        os.replace(fichier_temporaire, fichier_cache)
+        mesure.compter(lignes=len(promo), octets_ecrits=taille_fichier(fichier_cache))
+    return promo
 
 def usage():
     """
@@ -385,31 +2487,105 @@ def usage():
 
     CU: Le fichier usage.txt doit se trouver dans le même dossier que gestion_notes.py
     """
-    with open("usage.txt", "r", encoding = "latin-1") as usage:
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "usage.txt"), "r", encoding = "latin-1") as usage:
         for ligne in usage:
             print(ligne, end="")    
 
-if __name__ == "__main__":
-    import doctest
-    doctest.testmod(optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS, verbose=False)
+def executer(ues, dossier_donnees="data", fichier_sortie="notes_etudiants.csv", format_sortie="csv",
+             nb_processus=1, fichier_cache=FICHIER_CACHE):
+    """
+    Reporte les notes des UE données et écrit le fichier de notes : c'est le travail du script, sans la ligne de commande.
+    Toute la configuration est passée en paramètres, les constantes globales (UES...) ne sont pas modifiées.
+    
+    :param ues: ([str]) les noms des UE dont il faut reporter les notes
+    :param dossier_donnees: (str) le dossier qui contient liste_etudiants.csv et les fichiers notes_<ue>.csv
+    :param fichier_sortie: (str) le fichier de notes à écrire
+    :param format_sortie: (str) le format de ce fichier, voir ecrire_notes
+    :param nb_processus: (int) le nombre de processus qui lisent les fichiers de notes
+    :param fichier_cache: (str) le fichier de sauvegarde de charger_promo_incrementale
+    :return: None
+    
+    CU: Lève FileNotFoundError si un fichier manque et ValueError si une note n'est pas un nombre
+        ou si format_sortie n'est pas dans FORMATS_SORTIE
+    """
+    if not format_sortie in FORMATS_SORTIE:
+        raise ValueError("Format de sortie inconnu : {0}".format(format_sortie))
+    fichier_etudiants = os.path.join(dossier_donnees, "liste_etudiants.csv")
+    if not os.path.isfile(fichier_etudiants):
+        raise FileNotFoundError(fichier_etudiants)
+    fichiers_notes = {}
+    for UE in ues:
+        fichiers_notes[UE] = os.path.join(dossier_donnees, "notes_{0}.csv".format(UE))
+        if not os.path.isfile(fichiers_notes[UE]):
+            raise FileNotFoundError(fichiers_notes[UE])
+    promo = charger_promo_incrementale(fichier_etudiants, fichiers_notes, fichier_cache, nb_processus)
+    ecrire_notes(promo, fichier_sortie, format_sortie)
 
+def tester():
+    """
+    Lance les doctests du module, depuis le dossier qui contient gestion_notes.py et data.
+    
+    :return: (int) le nombre de tests échoués
+    
+    CU: any
+    """
+    import doctest
+    dossier_courant = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return doctest.testmod(sys.modules[__name__], optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS, verbose=False).failed
+    finally:
+        os.chdir(dossier_courant)
 
-if len(sys.argv) == 1:
-    usage()
-else:
-    UES = []
-    for i in range(1, len(sys.argv)):
-        UES.append(sys.argv[i])
-        
+def main(arguments=None):
+    """
+    Point d'entrée de la ligne de commande (voir usage.txt).
+    
+    :param arguments: ([str]) les paramètres de la ligne de commande, sys.argv[1:] par défaut
+    :return: (int) le code de retour du script : 0 si tout s'est bien passé
+    
+    CU: any
+    """
+    if arguments == None:
+        arguments = sys.argv[1:]
+    if len(arguments) == 0:
+        usage()
+        return 0
+    import argparse # Import coûteux, inutile quand le module est importé par un autre programme
+    parseur = argparse.ArgumentParser(prog="gestion_notes.py", description="Reporte les notes des UE et écrit le fichier de notes.")
+    parseur.add_argument("ues", nargs="*", metavar="ue", help="les noms des UE dont il faut reporter les notes")
+    parseur.add_argument("--jobs", type=int, default=1, help="nombre de processus qui lisent les fichiers de notes")
+    parseur.add_argument("--donnees", default="data", help="dossier des fichiers liste_etudiants.csv et notes_<ue>.csv")
+    parseur.add_argument("--sortie", default="notes_etudiants.csv", help="fichier de notes à écrire")
+    parseur.add_argument("--format", default="csv", choices=FORMATS_SORTIE, help="format du fichier de notes")
+    parseur.add_argument("--cache", default=FICHIER_CACHE, help="fichier de sauvegarde entre deux exécutions")
+    parseur.add_argument("--test", action="store_true", help="lance les doctests du module")
+    parseur.add_argument("--profile", action="store_true", help="écrit la durée, les lignes, les octets et la mémoire de chaque étape dans une trace JSON")
+    parseur.add_argument("--trace", default=os.environ.get(VARIABLE_PROFIL), metavar="fichier",
+                         help="fichier de la trace JSON, {0} par défaut (active --profile)".format(FICHIER_PROFIL))
+    parseur.add_argument("--cprofile", default=os.environ.get(VARIABLE_CPROFILE),
+                         metavar="fichier", help="écrit aussi les statistiques de cProfile dans ce fichier")
+    options = parseur.parse_args(arguments)
+    
+    if options.test:
+        return int(tester() > 0)
+    if len(options.ues) == 0:
+        usage()
+        return 1
+    if options.profile or options.trace != None or options.cprofile != None:
+        activer_profilage(options.trace if options.trace != None else FICHIER_PROFIL, options.cprofile)
     try:
-        if not os.path.isfile("data\\liste_etudiants.csv"):
-            raise FileNotFoundError("data\\liste_etudiants.csv")
-        liste_etudiants = lire_liste_etudiants("data\\liste_etudiants.csv")
-        trie_liste_etudiants(liste_etudiants)
-        for UE in UES:
-            if not os.path.isfile("data\\notes_{0}.csv".format(UE)):
-                raise FileNotFoundError("data\\notes_{0}.csv".format(UE))
-            reporter_notes4(UE, liste_etudiants, lire_liste_notes("data\\notes_{0}.csv".format(UE)))
-        ecrire_notes(liste_etudiants)
+        executer(options.ues, options.donnees, options.sortie, options.format, options.jobs, options.cache)
     except FileNotFoundError as fichier:
-        print("Le fichier {0} n'existe pas !".format(fichier))
\ No newline at end of file
+        print("Le fichier {0} n'existe pas !".format(fichier))
+        return 1
+    except ValueError:
+        print("Note du mauvais format (devrait être un nombre à point flottant")
+        return 1
+    finally:
+        if TRACE != None:
+            terminer_profilage()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,532 @@
+"""
+Service local de report des notes : la liste des étudiants est lue une seule fois et la promo reste en mémoire,
+les notes des UE sont envoyées au service au fur et à mesure, sans relancer gestion_notes.py.
+
+Usage : ./serveur_notes.py [options] <ue1> <ue2> ...
+        <ue1> <ue2> ... sont les noms des UE dont le service accepte les notes.
+        --hote <hote> et --port <port> sont l'adresse d'écoute (127.0.0.1 et 8080 par défaut).
+        --donnees <dossier> est le dossier du fichier liste_etudiants.csv (data par défaut).
+        --sortie <fichier> est le fichier de notes réécrit après chaque lot de notes (aucun par défaut).
+        --format csv|binaire est le format de ce fichier (csv par défaut).
+        --test lance les doctests du module.
+
+Requêtes HTTP
+=============
+
+:POST /notes/<ue>: le corps contient les lignes NIP|NOTE d'un fichier notes_<ue>.csv. La réponse est le rapport JSON du report.
+:GET /resultat/<nip>: la fiche de l'étudiant, sa moyenne, sa mention et ses rangs, en JSON.
+:GET /statistiques: l'histogramme des mentions, les moyennes des UE et la médiane, en JSON, avec ?profil=<profil> ou ?groupe=<groupe> pour se limiter à un profil ou un groupe.
+:GET /export: le fichier de notes à jour, avec ?format=binaire pour le format binaire.
+
+Les dépôts de notes arrivés pendant le traitement d'un lot sont reportés ensemble au lot suivant, dans leur ordre d'arrivée :
+le fichier de sortie n'est réécrit qu'une fois par lot.
+
+CU : le fichier gestion_notes.py doit se trouver dans le même dossier
+"""
+
+import asyncio
+import json
+import os.path
+import sys
+import tempfile
+from urllib.parse import parse_qs, urlsplit
+
+import gestion_notes
+
+STATUTS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+TAILLE_CORPS_MAX = 64 << 20 # Taille maximale d'un fichier de notes envoyé, en octets
+
+class ServeurNotes:
+    """
+    Promo gardée en mémoire, dont les notes sont reportées par lots.
+
+    Les dépôts (deposer) sont mis en attente et reportés par la tâche appliquer_lots avec l'index des NIP
+    construit au chargement, comme reporter_notes4. Les résultats et les statistiques sont tenus à jour
+    au fil des reports par gestion_notes.Statistiques, et les résultats gardés par gestion_notes.CacheResultats.
+
+    Exemple:
+
+    >>> serveur = ServeurNotes("data/petite_liste_etudiants.csv", ["maths", "info"])
+    >>> async def deposer_deux_ues():
+    ...     lots = asyncio.ensure_future(serveur.appliquer_lots())
+    ...     rapports = await asyncio.gather(serveur.deposer("info", notes_octets("data/petite_notes_info.csv")),
+    ...                                     serveur.deposer("maths", notes_octets("data/petite_notes_maths.csv")))
+    ...     lots.cancel()
+    ...     return rapports
+    >>> [(rapport["ue"], rapport["notes"], rapport["lot"]) for rapport in asyncio.run(deposer_deux_ues())]
+    [('info', 14, 2), ('maths', 14, 2)]
+    >>> serveur.resultat('11402978')["moyenne"], serveur.resultat('11402978')["rangs"]
+    (12.3, {'promo': 3, 'profil': 3, 'groupe': 1})
+    >>> serveur = ServeurNotes("data/petite_liste_etudiants.csv", ["maths", "info"])
+    >>> async def deposer_note_invalide():
+    ...     lots = asyncio.ensure_future(serveur.appliquer_lots())
+    ...     rapports = await asyncio.gather(serveur.deposer("maths", [('11402978', -4.0)]),
+    ...                                     serveur.deposer("maths", [('11402978', 16.0)]), return_exceptions=True)
+    ...     lots.cancel()
+    ...     return rapports
+    >>> [type(rapport).__name__ for rapport in asyncio.run(deposer_note_invalide())], serveur.resultat('11402978')["moyenne"]
+    (['ValueError', 'dict'], 8.0)
+    >>> async def deposer_une_note_invalide():
+    ...     lots = asyncio.ensure_future(serveur.appliquer_lots())
+    ...     try:
+    ...         await serveur.deposer("maths", [('11402978', 12.0), ('11503442', -4.0), ('11400130', 9.0)])
+    ...     finally:
+    ...         lots.cancel()
+    >>> asyncio.run(deposer_une_note_invalide())
+    Traceback (most recent call last):
+    ...
+    ValueError: Note hors de [0, 20] : -4.0
+    >>> serveur.resultat('11402978')["notes"]["maths"], serveur.resultat('11400130')["notes"]["maths"]
+    (16.0, None)
+    """
+
+    def __init__(self, fichier_etudiants, ues, fichier_sortie=None, format_sortie="csv"):
+        """
+        :param fichier_etudiants: (str) le fichier des étudiants
+        :param ues: ([str]) les UE de la promo
+        :param fichier_sortie: (str) le fichier de notes réécrit après chaque lot, None pour ne rien écrire
+        :param format_sortie: (str) le format de ce fichier, voir gestion_notes.ecrire_notes
+        """
+        self.promo = gestion_notes.Promo(gestion_notes.parcourir_etudiants(fichier_etudiants, ues), ues)
+        gestion_notes.trie_liste_etudiants(self.promo)
+        self.index = gestion_notes.index_nips(self.promo)
+        self.statistiques = gestion_notes.Statistiques(self.promo)
+        gestion_notes.activer_cache_resultats(self.promo) # Un export ne recalcule que les résultats modifiés depuis le précédent
+        self.fichier_sortie = fichier_sortie
+        self.format_sortie = format_sortie
+        self.en_attente = [] # Dépôts pas encore reportés : triplets (UE, notes, futur du rapport)
+        self.reveil = asyncio.Event()
+        self.exports = {} # Fichiers de notes déjà générés depuis le dernier lot {format: octets}
+        self.sortie_a_jour = False # True si fichier_sortie a été réécrit après le dernier lot
+        self.numero_lot = 0 # Nombre de lots reportés
+        self.verrou = asyncio.Lock() # Tenu pendant le report d'un lot et chaque écriture d'un fichier de notes
+
+    async def deposer(self, UE, notes):
+        """
+        Met les notes d'une UE en attente et renvoie le rapport de leur report, une fois leur lot reporté.
+        Les notes sont vérifiées avant la mise en attente : un dépôt refusé ne reporte aucune de ses notes.
+
+        :param UE: (str) l'UE
+        :param notes: (list) les couples (NIP, note)
+        :return: (dict) {"ue", "notes": nombre de notes, "orphelins": [NIP], "doublons": [NIP], "lot": nombre de dépôts du lot}
+
+        CU: la tâche appliquer_lots tourne. Lève ValueError si une note n'est pas entre 0 et gestion_notes.NOTE_MAX
+        """
+        verifier_notes(notes)
+        rapport = asyncio.get_running_loop().create_future()
+        self.en_attente.append((UE, notes, rapport))
+        self.reveil.set()
+        return await rapport
+
+    async def appliquer_lots(self):
+        """
+        Tâche qui reporte les dépôts en attente, lot par lot, puis réécrit le fichier de sortie une fois par lot.
+        Le verrou est tenu pendant tout le lot : un fichier de notes n'est jamais écrit pendant qu'un lot modifie la promo.
+        L'erreur d'un dépôt (ou de l'écriture du fichier de sortie) est renvoyée à son auteur, et la tâche continue.
+
+        :return: None (la tâche ne s'arrête que si elle est annulée)
+
+        CU: une seule tâche appliquer_lots par serveur
+        """
+        while True:
+            await self.reveil.wait()
+            self.reveil.clear()
+            lot, self.en_attente = self.en_attente, []
+            async with self.verrou:
+                self.numero_lot += 1
+                self.exports = {}
+                self.sortie_a_jour = False
+                rapports = []
+                for UE, notes, futur in lot:
+                    try:
+                        rapport = gestion_notes.joindre_notes(self.promo, {UE: notes}, "dico", self.index)
+                    except Exception as erreur:
+                        rapports.append(erreur)
+                    else:
+                        rapports.append({"ue": UE, "notes": len(notes), "orphelins": rapport["orphelins"][UE],
+                                         "doublons": rapport["doublons"][UE], "lot": len(lot)})
+                if self.fichier_sortie != None:
+                    try:
+                        await asyncio.get_running_loop().run_in_executor(
+                            None, gestion_notes.ecrire_notes, self.promo, self.fichier_sortie, self.format_sortie)
+                    except Exception as erreur:
+                        rapports = [erreur] * len(lot)
+                    else:
+                        self.sortie_a_jour = True
+            for (UE, notes, futur), rapport in zip(lot, rapports):
+                if futur.done():
+                    continue
+                if isinstance(rapport, Exception):
+                    futur.set_exception(rapport)
+                else:
+                    futur.set_result(rapport)
+
+    def resultat(self, NIP):
+        """
+        Renvoie la fiche d'un étudiant avec sa moyenne, sa mention et ses rangs dans la promo, son profil et son groupe.
+
+        :param NIP: (str) le NIP de l'étudiant
+        :return: (dict) {"nip", "nom", "prenom", "profil", "groupe", "notes", "moyenne", "mention", "rangs"}, None si le NIP est inconnu
+
+        CU: any
+        """
+        indice = self.index.get(NIP)
+        if indice == None:
+            return None
+        etudiant = self.promo[indice]
+        moyenne, mention = self.promo.cache_resultats.resultats(indice, indice + 1)[0]
+        rangs = {"promo" if par == None else par: self.statistiques.rang(NIP, par) for par in gestion_notes.CLES_STATISTIQUES}
+        return {"nip": etudiant[0], "nom": etudiant[1], "prenom": etudiant[2], "profil": etudiant[3], "groupe": etudiant[4],
+                "notes": dict(etudiant[5]), "moyenne": moyenne, "mention": mention, "rangs": rangs}
+
+    def statistiques_promo(self, profil=None, groupe=None):
+        """
+        Renvoie les statistiques de la promo, d'un profil ou d'un groupe.
+
+        :param profil: (str) un profil, pour se limiter à ses étudiants
+        :param groupe: (str) un groupe, pour se limiter à ses étudiants
+        :return: (dict) {"mentions": {mention: nombre}, "moyennes_ues": {UE: moyenne}, "mediane": moyenne}
+
+        CU: profil et groupe ne sont pas donnés tous les deux
+        """
+        return {"mentions": self.statistiques.histogramme_mentions(profil, groupe),
+                "moyennes_ues": self.statistiques.moyennes_ues(profil, groupe),
+                "mediane": self.statistiques.quantile(0.5, profil, groupe)}
+
+    async def exporter(self, format_sortie="csv"):
+        """
+        Renvoie le fichier de notes de la promo, généré au plus une fois par lot et par format.
+        Il est généré sous le verrou, donc jamais pendant le report d'un lot, et n'est gardé que si aucun lot
+        n'a été reporté depuis le début de l'export.
+
+        :param format_sortie: (str) "csv" ou "binaire"
+        :return: (bytes) le contenu du fichier
+
+        CU: format_sortie est dans gestion_notes.FORMATS_SORTIE, sinon ValueError est levée
+        """
+        if not format_sortie in gestion_notes.FORMATS_SORTIE:
+            raise ValueError("Format de sortie inconnu : {0}".format(format_sortie))
+        if format_sortie in self.exports:
+            return self.exports[format_sortie]
+        numero_lot = self.numero_lot
+        async with self.verrou:
+            if format_sortie in self.exports:
+                return self.exports[format_sortie]
+            if format_sortie == self.format_sortie and self.sortie_a_jour:
+                contenu = await asyncio.get_running_loop().run_in_executor(None, lire_octets, self.fichier_sortie)
+            else:
+                with tempfile.TemporaryDirectory() as dossier:
+                    fichier = os.path.join(dossier, "notes_etudiants")
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, gestion_notes.ecrire_notes, self.promo, fichier, format_sortie)
+                    contenu = lire_octets(fichier)
+        if self.numero_lot == numero_lot:
+            self.exports[format_sortie] = contenu
+        return contenu
+
+    async def traiter_connexion(self, lecteur, ecrivain):
+        """
+        Lit une requête HTTP, y répond puis ferme la connexion.
+        Si le fichier de sortie n'a pas pu être réécrit après un dépôt, la réponse est une erreur 500
+        qui précise que les notes ont quand même été reportées : il ne faut pas les renvoyer.
+
+        :param lecteur: (asyncio.StreamReader) le flux de la requête
+        :param ecrivain: (asyncio.StreamWriter) le flux de la réponse
+        :return: None
+
+        CU: any
+
+        Exemple:
+
+        >>> async def deposer_sans_sortie():
+        ...     serveur = ServeurNotes("data/petite_liste_etudiants.csv", ["maths", "info"], "/dossier/inexistant/notes.csv")
+        ...     pret = asyncio.get_running_loop().create_future()
+        ...     service = asyncio.ensure_future(servir(serveur, port=0, pret=pret))
+        ...     lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", await pret)
+        ...     ecrivain.write(b"POST /notes/maths HTTP/1.1\\r\\nContent-Length: 14\\r\\n\\r\\n11402978|12.0\\n")
+        ...     reponse = await lecteur.read()
+        ...     ecrivain.close()
+        ...     service.cancel()
+        ...     entete, corps = reponse.split(b"\\r\\n\\r\\n", 1)
+        ...     return entete.split(b"\\r\\n")[0].decode(), json.loads(corps)["erreur"].split(" : ")[0], serveur.promo.notes["maths"][serveur.index['11402978']]
+        >>> asyncio.run(deposer_sans_sortie())
+        ('HTTP/1.1 500 Internal Server Error', "Notes reportées, mais le fichier de sortie n'a pas pu être écrit", 12.0)
+        """
+        try:
+            try:
+                methode, chemin, entetes = await lire_entete(lecteur)
+                taille = int(entetes.get("content-length", "0"))
+                if taille > TAILLE_CORPS_MAX:
+                    statut, type_contenu, corps = reponse_json(400, {"erreur": "Fichier de notes trop gros"})
+                else:
+                    statut, type_contenu, corps = await self.repondre(methode, chemin, await lecteur.readexactly(taille))
+            except (ValueError, asyncio.IncompleteReadError):
+                statut, type_contenu, corps = reponse_json(400, {"erreur": "Requête mal formée"})
+            except OSError as erreur: # Levée par appliquer_lots, après le report des notes
+                statut, type_contenu, corps = reponse_json(500, {
+                    "erreur": "Notes reportées, mais le fichier de sortie n'a pas pu être écrit : {0}".format(erreur)})
+            except Exception as erreur:
+                statut, type_contenu, corps = reponse_json(500, {"erreur": "Erreur interne : {0!r}".format(erreur)})
+            ecrivain.write("HTTP/1.1 {0} {1}\r\nContent-Type: {2}\r\nContent-Length: {3}\r\nConnection: close\r\n\r\n".format(
+                statut, STATUTS[statut], type_contenu, len(corps)).encode("latin-1") + corps)
+            await ecrivain.drain()
+        finally:
+            ecrivain.close()
+
+    async def repondre(self, methode, chemin, corps):
+        """
+        Renvoie la réponse à une requête, voir les requêtes HTTP décrites au début du module.
+
+        :param methode: (str) la méthode HTTP
+        :param chemin: (str) le chemin demandé, avec ses paramètres
+        :param corps: (bytes) le corps de la requête
+        :return: ((int, str, bytes)) le statut, le type du contenu et le corps de la réponse
+
+        CU: any
+        """
+        adresse = urlsplit(chemin)
+        parties = adresse.path.strip("/").split("/")
+        parametres = {cle: valeurs[-1] for cle, valeurs in parse_qs(adresse.query).items()}
+        if parties[0] == "notes" and len(parties) == 2:
+            if methode != "POST":
+                return reponse_json(405, {"erreur": "Utiliser POST"})
+            if not parties[1] in self.promo.ues:
+                return reponse_json(404, {"erreur": "UE inconnue : {0}".format(parties[1])})
+            try:
+                notes = analyser_notes(corps)
+            except (ValueError, IndexError):
+                return reponse_json(400, {"erreur": "Note du mauvais format (devrait être un nombre entre 0 et {0})".format(gestion_notes.NOTE_MAX)})
+            return reponse_json(200, await self.deposer(parties[1], notes))
+        if methode != "GET":
+            return reponse_json(405, {"erreur": "Utiliser GET"})
+        if parties[0] == "resultat" and len(parties) == 2:
+            resultat = self.resultat(parties[1])
+            if resultat == None:
+                return reponse_json(404, {"erreur": "NIP inconnu : {0}".format(parties[1])})
+            return reponse_json(200, resultat)
+        if parties == ["statistiques"]:
+            return reponse_json(200, self.statistiques_promo(parametres.get("profil"), parametres.get("groupe")))
+        if parties == ["export"]:
+            format_sortie = parametres.get("format", "csv")
+            if not format_sortie in gestion_notes.FORMATS_SORTIE:
+                return reponse_json(400, {"erreur": "Format de sortie inconnu : {0}".format(format_sortie)})
+            type_contenu = "text/csv; charset=utf-8" if format_sortie == "csv" else "application/octet-stream"
+            return 200, type_contenu, await self.exporter(format_sortie)
+        return reponse_json(404, {"erreur": "Chemin inconnu : {0}".format(adresse.path)})
+
+async def lire_entete(lecteur):
+    """
+    Lit la ligne de requête et les en-têtes d'une requête HTTP.
+
+    :param lecteur: (asyncio.StreamReader) le flux de la requête
+    :return: ((str, str, dict)) la méthode, le chemin et les en-têtes {nom en minuscules: valeur}
+
+    CU: lève ValueError si la ligne de requête est mal formée
+    """
+    methode, chemin, version = (await lecteur.readline()).decode("latin-1").split()
+    entetes = {}
+    ligne = (await lecteur.readline()).decode("latin-1").strip()
+    while ligne:
+        nom, valeur = ligne.split(":", 1)
+        entetes[nom.strip().lower()] = valeur.strip()
+        ligne = (await lecteur.readline()).decode("latin-1").strip()
+    return methode, chemin, entetes
+
+def analyser_notes(corps):
+    """
+    Renvoie les notes contenues dans le corps d'une requête, au format des fichiers notes_<ue>.csv.
+
+    :param corps: (bytes) les lignes NIP <SEPARATEUR> NOTE
+    :return: (gestion_notes.NotesBrutes)
+
+    CU: Lève ValueError si une note n'est pas un nombre entre 0 et gestion_notes.NOTE_MAX (nan et inf sont refusés)
+        et IndexError si une ligne n'a pas de SEPARATEUR
+
+    Exemples:
+
+    >>> list(analyser_notes(b"11402978|14.2\\r\\n11503442|8.2\\r\\n"))
+    [('11402978', 14.2), ('11503442', 8.2)]
+    >>> analyser_notes(b"11402978|14.2\\n11503442|inf\\n")
+    Traceback (most recent call last):
+    ...
+    ValueError: Note hors de [0, 20] : inf
+    """
+    if len(corps) == 0:
+        return gestion_notes.NotesBrutes(bytearray(), 1, gestion_notes.array("d"))
+    notes = gestion_notes.analyser_notes_mmap(corps, len(corps))
+    verifier_notes(notes)
+    return notes
+
+def verifier_notes(notes):
+    """
+    Vérifie que toutes les notes d'un dépôt sont entre 0 et gestion_notes.NOTE_MAX.
+
+    :param notes: (list) les couples (NIP, note), ou des gestion_notes.NotesBrutes
+    :return: None
+
+    CU: Lève ValueError pour la première note hors de [0, gestion_notes.NOTE_MAX], nan et inf compris
+
+    Exemple:
+
+    >>> verifier_notes([('11402978', 12.0), ('11503442', float("nan"))])
+    Traceback (most recent call last):
+    ...
+    ValueError: Note hors de [0, 20] : nan
+    """
+    if isinstance(notes, gestion_notes.NotesBrutes):
+        valeurs = notes.notes # Sans construire les couples
+    else:
+        valeurs = (note for NIP, note in notes)
+    for note in valeurs:
+        if not 0 <= note <= gestion_notes.NOTE_MAX: # Faux aussi pour nan
+            raise ValueError("Note hors de [0, {0}] : {1}".format(gestion_notes.NOTE_MAX, note))
+
+def notes_octets(fichier):
+    """
+    Renvoie les notes d'un fichier, lues comme si elles avaient été envoyées au service.
+
+    :param fichier: (str) un fichier notes_<ue>.csv
+    :return: (gestion_notes.NotesBrutes)
+
+    CU: le fichier existe
+    """
+    return analyser_notes(lire_octets(fichier))
+
+def lire_octets(fichier):
+    """
+    Renvoie le contenu d'un fichier.
+
+    :param fichier: (str) le nom du fichier
+    :return: (bytes)
+
+    CU: le fichier existe
+    """
+    with open(fichier, "rb") as canal_fichier:
+        return canal_fichier.read()
+
+def reponse_json(statut, donnees):
+    """
+    Renvoie une réponse JSON.
+
+    :param statut: (int) le statut HTTP, une clé de STATUTS
+    :param donnees: (dict) les données de la réponse
+    :return: ((int, str, bytes)) le statut, le type du contenu et le corps de la réponse
+
+    CU: any
+
+    Exemple:
+
+    >>> reponse_json(404, {"erreur": "NIP inconnu"})
+    (404, 'application/json', b'{"erreur": "NIP inconnu"}')
+    """
+    return statut, "application/json", json.dumps(donnees, ensure_ascii=False).encode()
+
+async def servir(serveur, hote="127.0.0.1", port=8080, pret=None):
+    """
+    Ecoute les requêtes HTTP adressées au serveur de notes, jusqu'à ce que la tâche soit annulée.
+
+    :param serveur: (ServeurNotes) la promo en mémoire
+    :param hote: (str) l'adresse d'écoute
+    :param port: (int) le port d'écoute, 0 pour en choisir un libre
+    :param pret: (asyncio.Future) reçoit le port d'écoute quand le service est prêt, facultatif
+    :return: None
+
+    CU: any
+
+    Exemple:
+
+    >>> async def requete(port, texte):
+    ...     lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+    ...     ecrivain.write(texte)
+    ...     reponse = await lecteur.read()
+    ...     ecrivain.close()
+    ...     return reponse.split(b"\\r\\n\\r\\n", 1)
+    >>> async def session():
+    ...     pret = asyncio.get_running_loop().create_future()
+    ...     service = asyncio.ensure_future(servir(ServeurNotes("data/petite_liste_etudiants.csv", ["maths", "info"]), port=0, pret=pret))
+    ...     port = await pret
+    ...     corps = lire_octets("data/petite_notes_maths.csv")
+    ...     reponses = [await requete(port, b"POST /notes/maths HTTP/1.1\\r\\nContent-Length: " + str(len(corps)).encode() + b"\\r\\n\\r\\n" + corps),
+    ...                 await requete(port, b"GET /resultat/11503442 HTTP/1.1\\r\\n\\r\\n"),
+    ...                 await requete(port, b"GET /statistiques?profil=PEIP HTTP/1.1\\r\\n\\r\\n"),
+    ...                 await requete(port, b"GET /export HTTP/1.1\\r\\n\\r\\n"),
+    ...                 await requete(port, b"GET /resultat/00000000 HTTP/1.1\\r\\n\\r\\n")]
+    ...     service.cancel()
+    ...     return reponses
+    >>> for entete, corps in asyncio.run(session()):
+    ...     print(entete.split(b"\\r\\n")[0].decode(), corps.decode().split("\\n")[0])
+    HTTP/1.1 200 OK {"ue": "maths", "notes": 14, "orphelins": [], "doublons": [], "lot": 1}
+    HTTP/1.1 200 OK {"nip": "11503442", "nom": "BEAU", "prenom": "CORENTIN", "profil": "PEIP", "groupe": "13", "notes": {"maths": 8.2, "info": null}, "moyenne": 4.1, "mention": "Ajourné", "rangs": {"promo": 10, "profil": 2, "groupe": 1}}
+    HTTP/1.1 200 OK {"mentions": {"Absent": 0, "Ajourné": 3, "Passable": 0, "AB": 0, "B": 0, "TB": 0}, "moyennes_ues": {"maths": 8.3, "info": null}, "mediane": 4.1}
+    HTTP/1.1 200 OK 90000001|CALBUTH|RAYMOND|LICAM|1||||Absent
+    HTTP/1.1 404 Not Found {"erreur": "NIP inconnu : 00000000"}
+    """
+    lots = asyncio.ensure_future(serveur.appliquer_lots())
+    ecoute = await asyncio.start_server(serveur.traiter_connexion, hote, port)
+    try:
+        if pret != None:
+            pret.set_result(ecoute.sockets[0].getsockname()[1])
+        async with ecoute:
+            await ecoute.serve_forever()
+    finally:
+        lots.cancel()
+
+def tester():
+    """
+    Lance les doctests du module, depuis le dossier qui contient serveur_notes.py et data.
+
+    :return: (int) le nombre de tests échoués
+
+    CU: any
+    """
+    import doctest
+    dossier_courant = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return doctest.testmod(sys.modules[__name__], optionflags=doctest.NORMALIZE_WHITESPACE | doctest.ELLIPSIS, verbose=False).failed
+    finally:
+        os.chdir(dossier_courant)
+
+def main(arguments=None):
+    """
+    Point d'entrée de la ligne de commande (voir le début du module).
+
+    :param arguments: ([str]) les paramètres de la ligne de commande, sys.argv[1:] par défaut
+    :return: (int) le code de retour du script
+
+    CU: any
+    """
+    import argparse
+    parseur = argparse.ArgumentParser(prog="serveur_notes.py", description="Service local de report des notes.")
+    parseur.add_argument("ues", nargs="*", metavar="ue", help="les noms des UE dont le service accepte les notes")
+    parseur.add_argument("--hote", default="127.0.0.1", help="adresse d'écoute")
+    parseur.add_argument("--port", type=int, default=8080, help="port d'écoute")
+    parseur.add_argument("--donnees", default="data", help="dossier du fichier liste_etudiants.csv")
+    parseur.add_argument("--sortie", default=None, help="fichier de notes réécrit après chaque lot de notes")
+    parseur.add_argument("--format", default="csv", choices=gestion_notes.FORMATS_SORTIE, help="format du fichier de notes")
+    parseur.add_argument("--test", action="store_true", help="lance les doctests du module")
+    options = parseur.parse_args(arguments)
+
+    if options.test:
+        return int(tester() > 0)
+    if len(options.ues) == 0:
+        parseur.print_usage()
+        return 1
+    fichier_etudiants = os.path.join(options.donnees, "liste_etudiants.csv")
+    if not os.path.isfile(fichier_etudiants):
+        print("Le fichier {0} n'existe pas !".format(fichier_etudiants))
+        return 1
+
+    async def lancer():
+        # La promo est chargée dans la boucle d'événements, qui crée son Event
+        serveur = ServeurNotes(fichier_etudiants, options.ues, options.sortie, options.format)
+        print("Promo de {0} étudiants chargée, en écoute sur http://{1}:{2}/".format(len(serveur.promo), options.hote, options.port))
+        await servir(serveur, options.hote, options.port)
+    try:
+        asyncio.run(lancer())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())